@@ -0,0 +1,65 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, inspect, pool
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa: F401  registers the tables on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+# full-text artefacts are raw DDL (see app.models), not part of the metadata
+FTS_OBJECTS = {"search_vector", "ix_defects_search_vector"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("defects_fts"):
+        return False
+    return name not in FTS_OBJECTS
+
+
+# revision matching the schema the app created with create_all before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def adopt_unversioned_database(connection):
+    """Stamp a pre-migration database with the baseline so upgrade continues from there."""
+    tables = inspect(connection).get_table_names()
+    if "alembic_version" not in tables and "users" in tables:
+        context.get_context().stamp(context.script, BASELINE_REVISION)
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL
+
+
+def run_migrations_offline():
+    url = database_url()
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True,
+                      dialect_opts={"paramstyle": "named"}, render_as_batch=url.startswith("sqlite"),
+                      include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # a plain engine: no pool tuning or per-request instrumentation for a one-off run
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          render_as_batch=connection.dialect.name == "sqlite", include_object=include_object)
+        with context.begin_transaction():
+            adopt_unversioned_database(connection)
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
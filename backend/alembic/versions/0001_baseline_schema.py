@@ -0,0 +1,86 @@
+"""baseline schema: users, projects, defects as created by create_all before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:01:31.980494
+
+Databases created by the old import-time create_all match this revision
+exactly; env.py stamps them with it before upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=128), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', sa.Enum('admin', 'engineer', 'manager', 'observer', name='roleenum'), nullable=False),
+    sa.Column('full_name', sa.String(length=256), nullable=True),
+    sa.Column('email', sa.String(length=256), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=256), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_projects_id'), ['id'], unique=False)
+
+    op.create_table('defects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=256), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('new', 'in_progress', 'review', 'closed', 'canceled', name='defectstatus'), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_to', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_defects_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_defects_id'))
+
+    op.drop_table('defects')
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_projects_id'))
+
+    op.drop_table('projects')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+
+    op.drop_table('users')
+    # PostgreSQL keeps enum types after their tables are gone; a later upgrade would fail on them
+    sa.Enum(name='defectstatus').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='roleenum').drop(op.get_bind(), checkfirst=True)
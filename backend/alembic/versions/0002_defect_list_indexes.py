@@ -0,0 +1,34 @@
+"""composite indexes for the keyset-paginated defect list
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:01:32.104512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.create_index('ix_defects_project_status_priority', ['project_id', 'status', 'priority', 'id'], unique=False)
+        batch_op.create_index('ix_defects_project_status_updated', ['project_id', 'status', 'updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_defects_project_updated', ['project_id', 'updated_at', 'id'], unique=False)
+        batch_op.create_index('ix_defects_updated', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.drop_index('ix_defects_updated')
+        batch_op.drop_index('ix_defects_project_updated')
+        batch_op.drop_index('ix_defects_project_status_updated')
+        batch_op.drop_index('ix_defects_project_status_priority')
@@ -0,0 +1,32 @@
+"""updated_at on users and projects for list validators
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:01:32.211873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('users', 'projects'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        # the best known value for rows written before the column existed
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    for table in ('projects', 'users'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,57 @@
+"""full-text search over defect title/description
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 09:01:32.420917
+
+SQLite gets an external-content FTS5 table kept in sync by triggers and
+rebuilt from the existing rows; PostgreSQL a generated tsvector column with
+a GIN index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Copied from app.models at the time of this revision, so later edits there do not rewrite history.
+DEFECTS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS defects_fts USING fts5("
+    "title, description, content='defects', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_ai AFTER INSERT ON defects BEGIN "
+    "INSERT INTO defects_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_ad AFTER DELETE ON defects BEGIN "
+    "INSERT INTO defects_fts(defects_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_au AFTER UPDATE OF title, description ON defects BEGIN "
+    "INSERT INTO defects_fts(defects_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO defects_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO defects_fts(defects_fts) VALUES ('rebuild')",
+]
+DEFECTS_FTS_POSTGRESQL = [
+    "ALTER TABLE defects ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_defects_search_vector ON defects USING GIN (search_vector)",
+]
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for stmt in {"sqlite": DEFECTS_FTS_SQLITE, "postgresql": DEFECTS_FTS_POSTGRESQL}.get(dialect, []):
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ('defects_fts_ai', 'defects_fts_ad', 'defects_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS defects_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_defects_search_vector")
+        op.execute("ALTER TABLE defects DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,45 @@
+"""defect_events change log for delta sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 09:01:32.527344
+
+Existing defects get one event each, so a client syncing from cursor 0
+receives the whole table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('defect_events',
+    sa.Column('seq', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('defect_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('defect_events', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_defect_events_defect_id'), ['defect_id'], unique=False)
+
+    op.execute(
+        "INSERT INTO defect_events (defect_id, project_id, created_at) "
+        "SELECT id, project_id, updated_at FROM defects ORDER BY id"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('defect_events', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_defect_events_defect_id'))
+
+    op.drop_table('defect_events')
@@ -0,0 +1,53 @@
+"""report_jobs table for background report exports
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 09:06:34.871006
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('report_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=32), nullable=False),
+    sa.Column('params', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('queued', 'running', 'done', 'failed', 'expired', name='jobstatus'), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('rows_total', sa.Integer(), nullable=True),
+    sa.Column('result_path', sa.String(length=512), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_report_jobs_created_by'), ['created_by'], unique=False)
+        batch_op.create_index(batch_op.f('ix_report_jobs_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_report_jobs_status'), ['status'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_report_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_report_jobs_id'))
+        batch_op.drop_index(batch_op.f('ix_report_jobs_created_by'))
+
+    op.drop_table('report_jobs')
+    sa.Enum(name='jobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""index for sort=priority within a project without a status filter
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:41:12.603925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.create_index('ix_defects_project_priority', ['project_id', 'priority', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('defects', schema=None) as batch_op:
+        batch_op.drop_index('ix_defects_project_priority')
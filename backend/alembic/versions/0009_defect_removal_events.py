@@ -0,0 +1,54 @@
+"""log defect deletions and project moves in defect_events from triggers
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 10:02:47.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Copied from app.models at the time of this revision, so later edits there do not rewrite history.
+DEFECT_EVENTS_SQLITE = [
+    "CREATE TRIGGER IF NOT EXISTS defects_events_ad AFTER DELETE ON defects BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (old.id, old.project_id, CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_events_moved AFTER UPDATE OF project_id ON defects "
+    "WHEN old.project_id IS NOT new.project_id BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (old.id, old.project_id, CURRENT_TIMESTAMP); END",
+]
+DEFECT_EVENTS_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION defects_log_removal() RETURNS trigger AS $$ BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (OLD.id, OLD.project_id, now() AT TIME ZONE 'utc'); "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS defects_events_ad ON defects",
+    "CREATE TRIGGER defects_events_ad AFTER DELETE ON defects FOR EACH ROW EXECUTE FUNCTION defects_log_removal()",
+    "DROP TRIGGER IF EXISTS defects_events_moved ON defects",
+    "CREATE TRIGGER defects_events_moved AFTER UPDATE OF project_id ON defects FOR EACH ROW "
+    "WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id) EXECUTE FUNCTION defects_log_removal()",
+]
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for stmt in {"sqlite": DEFECT_EVENTS_SQLITE, "postgresql": DEFECT_EVENTS_POSTGRESQL}.get(dialect, []):
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS defects_events_moved")
+        op.execute("DROP TRIGGER IF EXISTS defects_events_ad")
+    elif dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS defects_events_moved ON defects")
+        op.execute("DROP TRIGGER IF EXISTS defects_events_ad ON defects")
+        op.execute("DROP FUNCTION IF EXISTS defects_log_removal()")
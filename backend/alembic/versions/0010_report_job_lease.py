@@ -0,0 +1,28 @@
+"""heartbeat lease on report_jobs, so only abandoned jobs are failed
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 11:02:47.318265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('report_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
@@ -0,0 +1,63 @@
+"""table_versions write counters for O(1) list ETags
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 12:14:05.662731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Copied from app.models at the time of this revision, so later edits there do not rewrite history.
+VERSIONED_TABLES = ("users", "projects")
+TABLE_VERSIONS_SQLITE = [
+    f"CREATE TRIGGER IF NOT EXISTS {table}_version_{dml.lower()} AFTER {dml} ON {table} BEGIN "
+    f"INSERT INTO table_versions (table_name, version) VALUES ('{table}', 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = version + 1; END"
+    for table in VERSIONED_TABLES for dml in ("INSERT", "UPDATE", "DELETE")
+]
+TABLE_VERSIONS_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$ BEGIN "
+    "INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+] + [
+    stmt for table in VERSIONED_TABLES for stmt in (
+        f"DROP TRIGGER IF EXISTS {table}_version ON {table}",
+        f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+    )
+]
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    dialect = op.get_bind().dialect.name
+    for stmt in {"sqlite": TABLE_VERSIONS_SQLITE, "postgresql": TABLE_VERSIONS_POSTGRESQL}.get(dialect, []):
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for table in VERSIONED_TABLES:
+            for dml in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{dml}")
+    elif dialect == "postgresql":
+        for table in VERSIONED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
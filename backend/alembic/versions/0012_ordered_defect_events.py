@@ -0,0 +1,42 @@
+"""serialize defect_events writers on PostgreSQL so seqs commit in order
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 12:40:19.204518
+
+Without this, /defects/changes could return seq N+1 before a concurrent
+transaction holding seq N committed, and that client would never see N.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Copied from app.models at the time of this revision, so later edits there do not rewrite history.
+DEFECT_EVENTS_ORDERED_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION defect_events_serialize() RETURNS trigger AS $$ BEGIN "
+    "PERFORM pg_advisory_xact_lock(hashtext('defect_events')); RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS defect_events_serialize ON defect_events",
+    "CREATE TRIGGER defect_events_serialize BEFORE INSERT ON defect_events "
+    "FOR EACH STATEMENT EXECUTE FUNCTION defect_events_serialize()",
+]
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite: a single writer at a time already commits seqs in order
+    if op.get_bind().dialect.name == "postgresql":
+        for stmt in DEFECT_EVENTS_ORDERED_POSTGRESQL:
+            op.execute(stmt)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS defect_events_serialize ON defect_events")
+        op.execute("DROP FUNCTION IF EXISTS defect_events_serialize()")
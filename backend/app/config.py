@@ -1,10 +1,79 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./dev.db"
+    # Opt-in AsyncSession path for the defects/projects/reports routers.
+    # ASYNC_DATABASE_URL defaults to DATABASE_URL with the async driver swapped in.
+    DATABASE_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool; /health/ready reports 503 at DB_POOL_READY_MAX_UTILIZATION
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_CONNECT_TIMEOUT: int = 10
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_POOL_READY_MAX_UTILIZATION: float = 1.0
+    # connections opened at startup; None = DB_POOL_SIZE
+    DB_POOL_WARM_CONNECTIONS: Optional[int] = None
+    # SQLite pragmas applied to every connection. WAL lets readers and the
+    # writer proceed concurrently; SQLITE_SEPARATE_WRITER funnels all writes
+    # through one dedicated connection.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_SEPARATE_WRITER: bool = False
+    # SQL instrumentation: statements slower than SLOW_QUERY_MS go to the
+    # "app.sql" logger (0 disables); requests issuing more than
+    # SQL_REQUEST_QUERY_WARN statements are logged with their slowest ones.
+    SLOW_QUERY_MS: float = 200.0
+    SQL_REQUEST_QUERY_WARN: int = 50
+    SQL_SLOWEST_KEPT: int = 5
+    # Per-request profiling: requests carrying an admin-issued X-Profile token,
+    # plus a random PROFILE_SAMPLE_RATE fraction, are stack-sampled into PROFILE_DIR.
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200
+    PROFILE_TOKEN_EXPIRE_MINUTES: int = 15
     SECRET_KEY: str = "change-me-to-secret"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Decoded tokens and resolved users cached by get_current_user; 0 disables.
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    # bcrypt process pool: None = min(4, cpu count), 0 = hash inline
+    PASSWORD_POOL_WORKERS: Optional[int] = None
+    PASSWORD_POOL_MAX_QUEUE: int = 64
+    PASSWORD_POOL_TIMEOUT_SECONDS: float = 10.0
+    # Attachments are stored content-addressed under UPLOAD_DIR
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_MAX_BYTES: int = 512 * 1024 * 1024
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    # Background report exports: a small dedicated thread pool and DB pool, so
+    # heavy reports never take request threads or interactive connections.
+    REPORT_DIR: str = "reports"
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_MAX_QUEUED: int = 20
+    REPORT_JOB_MAX_ACTIVE_PER_USER: int = 3
+    REPORT_JOB_RESULT_TTL_SECONDS: int = 24 * 3600
+    REPORT_JOB_CLEANUP_SECONDS: float = 300.0
+    # Queued/running jobs hold a lease renewed every REPORT_JOB_HEARTBEAT_SECONDS;
+    # one not renewed for REPORT_JOB_LEASE_SECONDS is failed as interrupted.
+    REPORT_JOB_HEARTBEAT_SECONDS: float = 30.0
+    REPORT_JOB_LEASE_SECONDS: float = 120.0
+    # Generated CSV exports cached by (filters, data version) with LRU eviction
+    # past either limit; REPORT_CACHE_MAX_BYTES=0 disables the cache.
+    REPORT_CACHE_DIR: str = "report_cache"
+    REPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    REPORT_CACHE_MAX_ENTRIES: int = 200
+    # Live defect events: per-subscriber queue bound and SSE keep-alive interval
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
 
     model_config = SettingsConfigDict(env_file=".env")
 
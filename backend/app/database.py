@@ -1,11 +1,257 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Optional
+from anyio.to_thread import run_sync
+from sqlalchemy import Delete, Insert, Update, create_engine, event, exc
+from sqlalchemy.engine import FrozenResult, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from app.utils import querystats
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class PoolStats:
+    """Checkout wait times and timeouts, which the pool itself does not track."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, timed_out: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def pool_options() -> dict:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def sqlite_pragmas() -> list:
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        # negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}",
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str, **overrides):
+    options = {}
+    connect_args = {}
+    dialect = make_url(url).get_backend_name()
+    if dialect == "sqlite":
+        connect_args["check_same_thread"] = False
+    elif dialect == "postgresql":
+        connect_args["connect_timeout"] = settings.DB_CONNECT_TIMEOUT
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    # in-memory SQLite keeps its single-connection pool
+    if make_url(url).database not in (None, "", ":memory:"):
+        options.update(poolclass=InstrumentedQueuePool, **pool_options())
+    options.update(overrides)
+    db_engine = create_engine(url, connect_args=connect_args, **options)
+    if dialect == "sqlite":
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    querystats.instrument(db_engine)
+    return db_engine
+
+
+class RoutingSession(Session):
+    """Session that sends flushes and DML statements to a dedicated writer engine.
+
+    Reads keep using the shared pool, so under WAL they never queue behind
+    writes. Reads inside the session do not see its own uncommitted writes
+    unless they pass ``bind_arguments={"writer": True}``; other sessions
+    ignore that argument.
+    """
+
+    def __init__(self, *args, writer=None, **kw):
+        super().__init__(*args, **kw)
+        self.writer = writer
+
+    def get_bind(self, mapper=None, clause=None, writer=False, **kw):
+        if self.writer is not None and (writer or self._flushing or isinstance(clause, (Insert, Update, Delete))):
+            return self.writer
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def warm_pool(db_engine, connections: Optional[int] = None) -> int:
+    """Open up to `connections` pooled connections (default: the pool size) and return them checked in."""
+    pool = db_engine.pool
+    if connections is None:
+        connections = pool.size() if isinstance(pool, QueuePool) else 1
+    opened = []
+    try:
+        for _ in range(max(connections, 0)):
+            conn = db_engine.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def pool_status(db_engine=None) -> dict:
+    pool = (db_engine or engine).pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "utilization": checked_out / capacity if capacity else 0.0,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            avg_wait_ms=1000 * stats.total_wait / stats.checkouts if stats.checkouts else 0.0,
+            max_wait_ms=1000 * stats.max_wait,
+        )
+    return status
+
+
+engine = create_db_engine(settings.DATABASE_URL)
+writer_engine = None
+if settings.SQLITE_SEPARATE_WRITER and engine.dialect.name == "sqlite":
+    writer_engine = create_db_engine(settings.DATABASE_URL, pool_size=1, max_overflow=0)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine,
+                                class_=RoutingSession, writer=writer_engine)
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {dialect!r}")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+def create_async_session_factory(url: str, **engine_options):
+    async_engine = create_async_engine(url, **engine_options)
+    if async_engine.dialect.name == "sqlite":
+        # aiosqlite connections need the same busy_timeout/WAL as the sync pool
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    querystats.instrument(async_engine)
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    AsyncSessionLocal = create_async_session_factory(
+        settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL), **pool_options()
+    )
+
+class ThreadpoolSession:
+    """The subset of the AsyncSession API used by the routers, backed by a sync Session.
+
+    Used when DATABASE_ASYNC is off, so async routers keep working on the
+    sync driver: every call that may touch the database runs in the worker
+    threadpool, and results come back fully buffered like AsyncSession's.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    async def execute(self, statement, params=None, **kw):
+        def _execute():
+            result = self.sync_session.execute(statement, params, **kw)
+            try:
+                return result.freeze()
+            except NotImplementedError:
+                # DML without RETURNING has no rows to buffer
+                return result
+        result = await run_sync(_execute)
+        return result() if isinstance(result, FrozenResult) else result
+
+    async def scalars(self, statement, params=None, **kw):
+        return (await self.execute(statement, params, **kw)).scalars()
+
+    async def scalar(self, statement, params=None, **kw):
+        return await run_sync(lambda: self.sync_session.scalar(statement, params, **kw))
+
+    async def get(self, entity, ident, **kw):
+        return await run_sync(lambda: self.sync_session.get(entity, ident, **kw))
+
+    async def run_sync(self, fn, *args, **kw):
+        return await run_sync(lambda: fn(self.sync_session, *args, **kw))
+
+    async def delete(self, instance):
+        await run_sync(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_sync(self.sync_session.flush)
+
+    async def refresh(self, instance):
+        await run_sync(self.sync_session.refresh, instance)
+
+    async def commit(self):
+        await run_sync(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_sync(self.sync_session.rollback)
+
+    async def close(self):
+        await run_sync(self.sync_session.close)
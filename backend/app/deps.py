@@ -1,8 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.utils.security import decode_access_token
+from app.database import SessionLocal, ThreadpoolSession
+from app import database
+import time
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.security import decode_access_token_claims
 from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -14,11 +18,47 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """AsyncSession when DATABASE_ASYNC is enabled, otherwise a threadpool-backed facade."""
+    if database.AsyncSessionLocal is not None:
+        async with database.AsyncSessionLocal() as db:
+            yield db
+        return
+    db = ThreadpoolSession(SessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+# token -> username and username -> detached User. Handlers that change a user
+# must call invalidate_user() so role changes and deletions apply immediately.
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_user(username: str):
+    user_cache.pop(username)
+
+def auth_cache_stats():
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    username = decode_access_token(token)
-    if not username:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    username = token_cache.get(token)
+    if username is None:
+        claims = decode_access_token_claims(token)
+        username = claims.get("sub") if claims else None
+        if not username:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication credentials")
+        # never serve a token from cache past its own expiry
+        token_cache.set(token, username, ttl=claims["exp"] - time.time() if "exp" in claims else None)
+
+    user = user_cache.get(username)
+    if user is None:
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        # detach so the instance can be shared read-only across requests
+        db.expunge(user)
+        # end the read: the connection goes back to the pool until the handler needs one
+        db.rollback()
+        user_cache.set(username, user)
     return user
@@ -1,72 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import os
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine, SessionLocal
-from app.routers import auth, users, projects, defects, reports
-from app.models import User, RoleEnum
-from app.utils.security import hash_password
-import datetime
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import configure_mappers
+from app.config import settings
+from app.database import engine, warm_pool
+from app.routers import auth, users, projects, defects, reports, health, admin, metrics
+from app.services.job_runner import job_runner
+from app.utils.password_pool import PasswordPoolBusy, password_pool
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
 
-# Create DB tables
-Base.metadata.create_all(bind=engine)
+# Schema is managed by alembic (alembic -c alembic/alembic.ini upgrade head);
+# demo accounts and synthetic data come from seed.py.
 
-# Create test users if they don't exist
-def create_test_users():
-    db = SessionLocal()
-    try:
-        # Check if any users exist
-        user_count = db.query(User).count()
-        if user_count == 0:
-            # Create test users
-            test_users = [
-                {
-                    'username': 'manager',
-                    'password': 'managerpass',
-                    'role': RoleEnum.manager,
-                    'full_name': 'Менеджер Проектов',
-                    'email': 'manager@test.com'
-                },
-                {
-                    'username': 'engineer',
-                    'password': 'engineerpass',
-                    'role': RoleEnum.engineer,
-                    'full_name': 'Инженер Строитель',
-                    'email': 'engineer@test.com'
-                },
-                {
-                    'username': 'observer',
-                    'password': 'observerpass',
-                    'role': RoleEnum.observer,
-                    'full_name': 'Наблюдатель',
-                    'email': 'observer@test.com'
-                }
-            ]
-            
-            for user_data in test_users:
-                user = User(
-                    username=user_data['username'],
-                    hashed_password=hash_password(user_data['password']),
-                    role=user_data['role'],
-                    full_name=user_data['full_name'],
-                    email=user_data['email'],
-                    is_active=True,
-                    created_at=datetime.datetime.utcnow()
-                )
-                db.add(user)
-            
-            db.commit()
-            print("✅ Тестовые пользователи созданы!")
-        else:
-            print(f"ℹ️ Найдено {user_count} пользователей в базе данных")
-    except Exception as e:
-        print(f"❌ Ошибка создания пользователей: {e}")
-        db.rollback()
-    finally:
-        db.close()
+def warm_up(app: FastAPI):
+    # open the pool's connections now instead of on the first requests
+    warm_pool(engine, settings.DB_POOL_WARM_CONNECTIONS)
+    # mapper configuration and the OpenAPI schema are otherwise built lazily by the first caller
+    configure_mappers()
+    app.openapi()
 
-# Initialize test data - disabled due to password length issue
-# create_test_users()
+async def cleanup_report_jobs():
+    while True:
+        await asyncio.sleep(settings.REPORT_JOB_CLEANUP_SECONDS)
+        await run_in_threadpool(job_runner.cleanup_expired)
+        await run_in_threadpool(job_runner.fail_stale)
 
-app = FastAPI(title="Construction Defects System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # per-process initialisation lives here, not at import time, so importing
+    # the app (tests, alembic, tooling) stays cheap and side-effect free
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    await run_in_threadpool(warm_up, app)
+    # spawn bcrypt workers in the background; readiness does not wait for them
+    password_pool.warm()
+    await run_in_threadpool(job_runner.fail_stale)
+    cleanup = asyncio.create_task(cleanup_report_jobs())
+    yield
+    cleanup.cancel()
+    job_runner.shutdown()
+    password_pool.shutdown()
+    engine.dispose()
+
+app = FastAPI(title="Construction Defects System", lifespan=lifespan)
 
 # CORS for frontend dev and docker
 app.add_middleware(
@@ -75,13 +55,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Profile-Id"],
 )
+app.add_middleware(ProfilingMiddleware)
+# outermost, so latency includes CORS, profiling and the error handlers
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/auth")
 app.include_router(users.router, prefix="/users")
 app.include_router(projects.router, prefix="/projects")
 app.include_router(defects.router, prefix="/defects")
 app.include_router(reports.router, prefix="/reports")
+app.include_router(health.router, prefix="/health")
+app.include_router(admin.router, prefix="/admin")
+app.include_router(metrics.router)
+
+@app.exception_handler(PasswordPoolBusy)
+def password_pool_busy_handler(request: Request, exc: PasswordPoolBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 @app.get("/")
 def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Enum, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Text, Enum, Boolean, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -20,6 +20,7 @@ class User(Base):
     email = Column(String(256), nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
 class Project(Base):
     __tablename__ = "projects"
@@ -27,6 +28,7 @@ class Project(Base):
     name = Column(String(256), unique=True, nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     defects = relationship("Defect", back_populates="project", cascade="all, delete-orphan")
 
 class DefectStatus(str, enum.Enum):
@@ -52,3 +54,168 @@ class Defect(Base):
     project = relationship("Project", back_populates="defects")
     assignee = relationship("User", foreign_keys=[assigned_to])
     author = relationship("User", foreign_keys=[created_by])
+    attachments = relationship("Attachment", back_populates="defect", cascade="all, delete-orphan")
+
+    # Composite indexes backing the keyset-paginated list: filter columns first,
+    # then the sort key and id as a tie-breaker so each page is an index range scan.
+    __table_args__ = (
+        Index("ix_defects_project_status_updated", "project_id", "status", "updated_at", "id"),
+        Index("ix_defects_project_status_priority", "project_id", "status", "priority", "id"),
+        Index("ix_defects_project_updated", "project_id", "updated_at", "id"),
+        Index("ix_defects_project_priority", "project_id", "priority", "id"),
+        Index("ix_defects_updated", "updated_at", "id"),
+    )
+
+# Full-text index over defect title/description, maintained by the database
+# itself so every write path (ORM, bulk insert, bulk update) stays in sync.
+# SQLite: external-content FTS5 table plus triggers. PostgreSQL: generated
+# tsvector column with a GIN index.
+DEFECTS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS defects_fts USING fts5("
+    "title, description, content='defects', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_ai AFTER INSERT ON defects BEGIN "
+    "INSERT INTO defects_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_ad AFTER DELETE ON defects BEGIN "
+    "INSERT INTO defects_fts(defects_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_fts_au AFTER UPDATE OF title, description ON defects BEGIN "
+    "INSERT INTO defects_fts(defects_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO defects_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO defects_fts(defects_fts) VALUES ('rebuild')",
+]
+DEFECTS_FTS_POSTGRESQL = [
+    "ALTER TABLE defects ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_defects_search_vector ON defects USING GIN (search_vector)",
+]
+
+for _stmt in DEFECTS_FTS_SQLITE:
+    event.listen(Defect.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in DEFECTS_FTS_POSTGRESQL:
+    event.listen(Defect.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+event.listen(Defect.__table__, "before_drop", DDL("DROP TABLE IF EXISTS defects_fts").execute_if(dialect="sqlite"))
+
+class Attachment(Base):
+    __tablename__ = "attachments"
+    id = Column(Integer, primary_key=True, index=True)
+    defect_id = Column(Integer, ForeignKey("defects.id"), nullable=False, index=True)
+    filename = Column(String(256), nullable=False)
+    sha256 = Column(String(64), nullable=False, index=True)  # file lives at uploads/<aa>/<sha256>
+    size = Column(BigInteger, nullable=False)
+    mime = Column(String(128), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    defect = relationship("Defect", back_populates="attachments")
+
+class DefectEvent(Base):
+    """Append-only log of defect writes; seq is the delta-sync cursor."""
+    __tablename__ = "defect_events"
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    # no FK: events must outlive the defect so clients can receive tombstones
+    defect_id = Column(Integer, nullable=False, index=True)
+    project_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # never reuse a seq after the newest rows are deleted
+    __table_args__ = {"sqlite_autoincrement": True}
+
+# /defects/changes pages by seq > since, so seqs must become visible in order.
+# SQLite's single writer lock does that already. PostgreSQL hands out
+# sequence values to concurrent transactions that may commit in any order, so
+# every insert into defect_events first takes a transaction-scoped advisory
+# lock, before the row's nextval. Event writers then commit one at a time, in
+# seq order.
+DEFECT_EVENTS_ORDERED_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION defect_events_serialize() RETURNS trigger AS $$ BEGIN "
+    "PERFORM pg_advisory_xact_lock(hashtext('defect_events')); RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS defect_events_serialize ON defect_events",
+    # per statement, so it fires before any row's seq default is evaluated
+    "CREATE TRIGGER defect_events_serialize BEFORE INSERT ON defect_events "
+    "FOR EACH STATEMENT EXECUTE FUNCTION defect_events_serialize()",
+]
+
+# Removals are logged by the database, so a tombstone reaches /defects/changes
+# however the row goes away (ORM delete, Project cascade, bulk DELETE). A
+# defect moved to another project gets an event under its old project too,
+# so that project's filtered feed reports it as removed.
+DEFECT_EVENTS_SQLITE = [
+    "CREATE TRIGGER IF NOT EXISTS defects_events_ad AFTER DELETE ON defects BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (old.id, old.project_id, CURRENT_TIMESTAMP); END",
+    "CREATE TRIGGER IF NOT EXISTS defects_events_moved AFTER UPDATE OF project_id ON defects "
+    "WHEN old.project_id IS NOT new.project_id BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (old.id, old.project_id, CURRENT_TIMESTAMP); END",
+]
+DEFECT_EVENTS_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION defects_log_removal() RETURNS trigger AS $$ BEGIN "
+    "INSERT INTO defect_events (defect_id, project_id, created_at) VALUES (OLD.id, OLD.project_id, now() AT TIME ZONE 'utc'); "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS defects_events_ad ON defects",
+    "CREATE TRIGGER defects_events_ad AFTER DELETE ON defects FOR EACH ROW EXECUTE FUNCTION defects_log_removal()",
+    "DROP TRIGGER IF EXISTS defects_events_moved ON defects",
+    "CREATE TRIGGER defects_events_moved AFTER UPDATE OF project_id ON defects FOR EACH ROW "
+    "WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id) EXECUTE FUNCTION defects_log_removal()",
+] + DEFECT_EVENTS_ORDERED_POSTGRESQL
+
+# on the metadata: the triggers need both tables, whatever order they are created in
+for _stmt in DEFECT_EVENTS_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in DEFECT_EVENTS_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+class TableVersion(Base):
+    """Write counter per table, bumped by triggers; list ETags read it in O(1)."""
+    __tablename__ = "table_versions"
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+VERSIONED_TABLES = ("users", "projects")
+TABLE_VERSIONS_SQLITE = [
+    f"CREATE TRIGGER IF NOT EXISTS {_table}_version_{_op.lower()} AFTER {_op} ON {_table} BEGIN "
+    f"INSERT INTO table_versions (table_name, version) VALUES ('{_table}', 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = version + 1; END"
+    for _table in VERSIONED_TABLES for _op in ("INSERT", "UPDATE", "DELETE")
+]
+TABLE_VERSIONS_POSTGRESQL = [
+    "CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$ BEGIN "
+    "INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1; "
+    "RETURN NULL; END $$ LANGUAGE plpgsql",
+] + [
+    _stmt for _table in VERSIONED_TABLES for _stmt in (
+        f"DROP TRIGGER IF EXISTS {_table}_version ON {_table}",
+        # per statement, so a bulk write bumps the counter once
+        f"CREATE TRIGGER {_table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {_table} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+    )
+]
+
+for _stmt in TABLE_VERSIONS_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in TABLE_VERSIONS_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+    expired = "expired"
+
+class ReportJob(Base):
+    """Background report export; the result file lives under REPORT_DIR until expires_at."""
+    __tablename__ = "report_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(32), nullable=False)
+    params = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(Enum(JobStatus), default=JobStatus.queued, nullable=False, index=True)
+    rows_done = Column(Integer, default=0, nullable=False)
+    rows_total = Column(Integer, nullable=True)
+    result_path = Column(String(512), nullable=True)
+    size = Column(BigInteger, nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # lease, renewed while queued/running
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.database import pool_status
+from app.deps import get_current_user
+from app.models import RoleEnum
+from app.utils.profiling import create_profile_token, list_profiles, profile_path
+
+router = APIRouter()
+
+def require_admin(current=Depends(get_current_user)):
+    if current.role != RoleEnum.admin:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return current
+
+@router.get("/pool", tags=["admin"])
+def get_pool_status(current=Depends(require_admin)):
+    return pool_status()
+
+@router.post("/profiles/token", tags=["admin"])
+def issue_profile_token(current=Depends(require_admin)):
+    """Send the token as the X-Profile header to profile that request."""
+    return {"header": "X-Profile", "token": create_profile_token(current.username)}
+
+@router.get("/profiles", tags=["admin"])
+def get_profiles(current=Depends(require_admin)):
+    return list_profiles()
+
+@router.get("/profiles/{profile_id}", tags=["admin"])
+def download_profile(profile_id: str, current=Depends(require_admin)):
+    # collapsed stacks: feed to flamegraph.pl or open in speedscope
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
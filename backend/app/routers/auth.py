@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.deps import get_db
+from app.deps import get_async_db, get_db
 from app.services.auth_service import authenticate_user, create_user
 from app.schemas import Token, UserCreate, UserOut
 from app.models import RoleEnum
@@ -9,17 +10,17 @@ from app.models import RoleEnum
 router = APIRouter()
 
 @router.post("/token", response_model=Token, tags=["auth"])
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    auth = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    auth = await authenticate_user(db, form_data.username, form_data.password)
     if not auth:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
     return {"access_token": auth["token"], "token_type": "bearer"}
 
 @router.post("/register", response_model=UserOut, tags=["auth"])
-def register(payload: UserCreate, db: Session = Depends(get_db)):
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Public registration always creates an observer regardless of requested role
     payload.role = RoleEnum.observer
-    user = create_user(db, payload)
+    user = await create_user(db, payload)
     return user
 
 @router.post("/create-test-users", tags=["auth"])
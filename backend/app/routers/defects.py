@@ -1,17 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from anyio import from_thread
+import mimetypes
+import os
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.deps import get_db, get_current_user
-from app.schemas import DefectCreate, DefectOut, DefectUpdate
-from app.models import Defect, Project, DefectStatus, RoleEnum
-from app.utils.file_upload import save_upload
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.deps import get_async_db, get_current_user
+from app.schemas import (
+    AttachmentOut, DefectBulkResult, DefectBulkUpdate, DefectChanges, DefectCreate, DefectOut, DefectUpdate,
+    ImportReport,
+)
+from app.models import Attachment, Defect, DefectEvent, Project, DefectStatus, RoleEnum
+from app.services.change_service import CHANGES_PAGE_SIZE, defect_changes, defect_event_rows
+from app.services.event_broker import broker, defect_event, import_events, sse_stream
+from app.services.import_service import IMPORT_FORMATS, run_import
+from app.services.search_service import search_defects
+from app.config import settings
+from app.services.version_service import version_query
+from app.utils.etag import if_none_match, make_etag, not_modified, set_validator
+from app.utils.file_upload import InvalidUpload, UploadTooLarge, content_path, receive_upload
+from app.utils.projection import parse_fields, rows_response, select_columns
+from app.utils.pagination import (
+    InvalidCursor, decode_cursor, keyset_segments, parse_sort, split_page,
+)
 
 router = APIRouter()
 
 @router.post("/", response_model=DefectOut)
-def create_defect(payload: DefectCreate, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def create_defect(payload: DefectCreate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
     # any authenticated user can create
-    project = db.query(Project).filter(Project.id == payload.project_id).first()
+    project = await db.get(Project, payload.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     d = Defect(
@@ -23,37 +43,122 @@ def create_defect(payload: DefectCreate, db: Session = Depends(get_db), current=
         created_by=current.id,
     )
     db.add(d)
-    db.commit()
-    db.refresh(d)
+    await db.flush()
+    db.add(DefectEvent(defect_id=d.id, project_id=d.project_id))
+    await db.commit()
+    await db.refresh(d)
+    broker.publish(defect_event("create", d))
     return d
 
+@router.post("/import", response_model=ImportReport)
+async def import_defects_file(file: UploadFile = File(...),
+                              format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+                              current=Depends(get_current_user)):
+    if current.role not in (RoleEnum.manager, RoleEnum.admin):
+        raise HTTPException(403, "Forbidden")
+    fmt = format or IMPORT_FORMATS.get(os.path.splitext(file.filename or "")[1].lower())
+    if not fmt:
+        raise HTTPException(400, "Unknown file format, pass format=csv or format=ndjson")
+
+    def on_commit(written):
+        # runs in the worker thread; the broker belongs to the event loop
+        from_thread.run_sync(broker.publish_all, import_events(written))
+
+    return await run_in_threadpool(run_import, file.file, fmt, current.id, on_commit=on_commit)
+
+SORT_PATTERN = "^-?(id|updated_at|priority)$"
+
 @router.get("/", response_model=List[DefectOut])
-def list_defects(db: Session = Depends(get_db),
-                 status: Optional[DefectStatus] = Query(None),
-                 project_id: Optional[int] = Query(None),
-                 current=Depends(get_current_user)):
-    q = db.query(Defect)
+async def list_defects(request: Request,
+                       db: AsyncSession = Depends(get_async_db),
+                       status: Optional[DefectStatus] = Query(None),
+                       project_id: Optional[int] = Query(None),
+                       limit: Optional[int] = Query(None, ge=1, le=500),
+                       cursor: Optional[str] = Query(None),
+                       sort: str = Query("id", pattern=SORT_PATTERN),
+                       fields: Optional[str] = Query(None, description="Comma-separated subset of DefectOut fields"),
+                       current=Depends(get_current_user)):
+    names = parse_fields(fields, DefectOut)
+    conditions = []
     if status:
-        q = q.filter(Defect.status == status)
+        conditions.append(Defect.status == status)
     if project_id:
-        q = q.filter(Defect.project_id == project_id)
-    return q.all()
+        conditions.append(Defect.project_id == project_id)
+
+    # answer conditional requests before loading any rows
+    version = (await db.execute(version_query(Defect))).one()
+    etag = make_etag("defects", *version, str(request.query_params))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    headers = {}
+    set_validator(headers, etag)
+
+    key, descending = parse_sort(sort)
+    key_col = getattr(Defect, key)
+    # plain column tuples; id and the sort key ride along for the cursor
+    stmt = select(*select_columns(Defect, names, "id", key)).where(*conditions)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort)
+        except InvalidCursor as e:
+            raise HTTPException(400, str(e))
+    rows = []
+    for where, order in keyset_segments(key_col, Defect.id, after, descending):
+        segment = stmt.where(*where).order_by(*order)
+        if limit is not None:
+            segment = segment.limit(limit + 1 - len(rows))
+        rows.extend((await db.execute(segment)).all())
+        if limit is not None and len(rows) > limit:
+            break
+    if limit is None:
+        # legacy unpaginated mode
+        return rows_response(rows, names, headers)
+
+    page, next_cursor = split_page(rows, sort, key, limit)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return rows_response(page, names, headers)
+
+@router.get("/events")
+async def stream_events(request: Request, project_id: Optional[int] = Query(None), current=Depends(get_current_user)):
+    """Server-Sent Events feed of defect create/update/assign events."""
+    sub = broker.subscribe(project_id)
+    return StreamingResponse(sse_stream(request, sub, settings.EVENTS_HEARTBEAT_SECONDS),
+                             media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/search", response_model=List[DefectOut])
+async def search(q: str = Query(..., min_length=1),
+                 project_id: Optional[int] = Query(None),
+                 limit: int = Query(50, ge=1, le=200),
+                 offset: int = Query(0, ge=0),
+                 db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    return await db.run_sync(search_defects, q, project_id=project_id, limit=limit, offset=offset)
+
+@router.get("/changes", response_model=DefectChanges)
+async def list_changes(since: int = Query(0, ge=0),
+                       project_id: Optional[int] = Query(None),
+                       limit: int = Query(CHANGES_PAGE_SIZE, ge=1, le=CHANGES_PAGE_SIZE),
+                       db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    return await db.run_sync(defect_changes, since, project_id=project_id, limit=limit)
 
 @router.get("/{defect_id}", response_model=DefectOut)
-def get_defect(defect_id: int, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    d = db.query(Defect).filter(Defect.id == defect_id).first()
+async def get_defect(defect_id: int, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    d = await db.get(Defect, defect_id)
     if not d:
         raise HTTPException(404, "Not found")
     return d
 
 @router.put("/{defect_id}", response_model=DefectOut)
-def update_defect(defect_id: int, payload: DefectUpdate, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    d = db.query(Defect).filter(Defect.id == defect_id).first()
+async def update_defect(defect_id: int, payload: DefectUpdate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    d = await db.get(Defect, defect_id)
     if not d:
         raise HTTPException(404, "Not found")
     # simple RBAC: engineers/managers can update
     if current.role not in (RoleEnum.manager, RoleEnum.engineer):
         raise HTTPException(403, "Forbidden")
+    assignee = d.assigned_to
     for field, val in payload.dict(exclude_unset=True).items():
         if field == "status" and isinstance(val, str):
             try:
@@ -62,15 +167,112 @@ def update_defect(defect_id: int, payload: DefectUpdate, db: Session = Depends(g
                 raise HTTPException(422, "Invalid status")
         setattr(d, field, val)
     db.add(d)
-    db.commit()
-    db.refresh(d)
+    db.add(DefectEvent(defect_id=d.id, project_id=d.project_id))
+    await db.commit()
+    await db.refresh(d)
+    broker.publish(defect_event("assign" if d.assigned_to != assignee else "update", d))
     return d
 
-@router.post("/{defect_id}/attachments")
-async def upload_attachment(defect_id: int, file: UploadFile = File(...), db: Session = Depends(get_db), current=Depends(get_current_user)):
-    d = db.query(Defect).filter(Defect.id == defect_id).first()
+@router.delete("/{defect_id}", status_code=204)
+async def delete_defect(defect_id: int, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    if current.role not in (RoleEnum.manager, RoleEnum.admin):
+        raise HTTPException(403, "Forbidden")
+    d = await db.get(Defect, defect_id)
     if not d:
         raise HTTPException(404, "Not found")
-    path = await save_upload(file)
-    # For simplicity, just return path; in production you would store metadata in DB
-    return {"path": path}
+    event = defect_event("delete", d)
+    # the tombstone in defect_events is written by a database trigger
+    await db.delete(d)
+    await db.commit()
+    broker.publish(event)
+    return Response(status_code=204)
+
+@router.patch("/bulk", response_model=DefectBulkResult)
+async def bulk_update_defects(payload: DefectBulkUpdate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    # same RBAC as update_defect
+    if current.role not in (RoleEnum.manager, RoleEnum.engineer):
+        raise HTTPException(403, "Forbidden")
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(422, "Pass either ids or filter")
+    changes = payload.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(422, "No changes given")
+
+    stmt = update(Defect).values(**changes)
+    if payload.ids is not None:
+        stmt = stmt.where(Defect.id.in_(payload.ids))
+    else:
+        conditions = [getattr(Defect, field) == val for field, val in payload.filter.model_dump(exclude_none=True).items()]
+        if not conditions:
+            raise HTTPException(422, "Filter must not be empty")
+        stmt = stmt.where(*conditions)
+    # one UPDATE ... WHERE ... RETURNING in a single transaction
+    returning = (Defect.id, Defect.project_id, Defect.status, Defect.assigned_to)
+    result = await db.execute(stmt.returning(*returning).execution_options(synchronize_session=False))
+    written = result.all()
+    if written:
+        await db.execute(insert(DefectEvent), defect_event_rows((row.id, row.project_id) for row in written))
+    await db.commit()
+    kind = "assign" if "assigned_to" in changes else "update"
+    for row in written:
+        broker.publish(defect_event(kind, row))
+    ids = sorted(row.id for row in written)
+    return {"updated": len(ids), "ids": ids}
+
+# The body is parsed by receive_upload rather than declared as UploadFile, so
+# the multipart schema is documented by hand.
+ATTACHMENT_UPLOAD_BODY = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"],
+    "properties": {"file": {"type": "string", "format": "binary"}},
+}}}}}
+
+@router.post("/{defect_id}/attachments", response_model=AttachmentOut, openapi_extra=ATTACHMENT_UPLOAD_BODY)
+async def upload_attachment(defect_id: int, request: Request, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    if not await db.get(Defect, defect_id):
+        raise HTTPException(404, "Not found")
+    # end the read, so no pooled connection is held while a large body streams in
+    await db.rollback()
+    try:
+        stored = await receive_upload(request)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    except InvalidUpload as e:
+        raise HTTPException(400, str(e))
+    attachment = Attachment(
+        defect_id=defect_id,
+        filename=stored.filename or stored.sha256,
+        sha256=stored.sha256,
+        size=stored.size,
+        mime=stored.content_type or mimetypes.guess_type(stored.filename or "")[0],
+        created_by=current.id,
+    )
+    db.add(attachment)
+    await db.commit()
+    await db.refresh(attachment)
+    return attachment
+
+@router.get("/{defect_id}/attachments", response_model=List[AttachmentOut])
+async def list_attachments(defect_id: int, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    if not await db.get(Defect, defect_id):
+        raise HTTPException(404, "Not found")
+    stmt = select(Attachment).where(Attachment.defect_id == defect_id).order_by(Attachment.id)
+    return (await db.scalars(stmt)).all()
+
+@router.get("/{defect_id}/attachments/{attachment_id}")
+async def download_attachment(defect_id: int, attachment_id: int, request: Request,
+                              db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    attachment = await db.get(Attachment, attachment_id)
+    if not attachment or attachment.defect_id != defect_id:
+        raise HTTPException(404, "Not found")
+    path = content_path(attachment.sha256)
+    if not await run_in_threadpool(os.path.exists, path):
+        # the row outlived its content (restored DB, pruned UPLOAD_DIR)
+        raise HTTPException(410, "Attachment content is no longer available")
+    # content-addressed, so the hash is a strong validator and the bytes never change
+    etag = f'"{attachment.sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    # FileResponse streams from disk and answers Range / If-Range itself
+    return FileResponse(path, media_type=attachment.mime,
+                        filename=attachment.filename, content_disposition_type="inline", headers=headers)
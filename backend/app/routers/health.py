@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.database import pool_status
+
+router = APIRouter()
+
+@router.get("/live", tags=["health"])
+def live():
+    return {"status": "ok"}
+
+@router.get("/ready", tags=["health"])
+def ready():
+    # no query here: with an exhausted pool it would just queue behind everyone else
+    pool = pool_status()
+    saturated = pool.get("utilization", 0.0) >= settings.DB_POOL_READY_MAX_UTILIZATION
+    return JSONResponse(status_code=503 if saturated else 200,
+                        content={"status": "saturated" if saturated else "ok", "pool": pool})
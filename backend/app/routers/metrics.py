@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.database import pool_status
+from app.deps import auth_cache_stats
+from app.services.event_broker import broker
+from app.services.job_runner import job_runner
+from app.services.report_cache import report_cache
+from app.utils.metrics import registry
+from app.utils.password_pool import password_pool
+
+router = APIRouter()
+
+registry.add_collector("auth_cache", "Token/user cache counters.", auth_cache_stats)
+registry.add_collector("password_pool", "Password hashing process pool.", password_pool.stats)
+registry.add_collector("db_pool", "Database connection pool.", pool_status)
+registry.add_collector("events", "Server-Sent Events broker.", broker.stats)
+registry.add_collector("report_jobs", "Background report job runner.", job_runner.stats)
+registry.add_collector("report_cache", "Generated report file cache.", report_cache.stats)
+
+@router.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text exposition format 0.0.4
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,24 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
-from sqlalchemy.orm import Session
-from app.deps import get_db, get_current_user
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps import get_async_db, get_current_user
 from app.schemas import ProjectCreate, ProjectOut
 from app.models import Project, RoleEnum
+from app.services.version_service import version_query
+from app.utils.etag import if_none_match, make_etag, not_modified, set_validator
 
 router = APIRouter()
 
 @router.post("/", response_model=ProjectOut)
-def create_project(payload: ProjectCreate, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def create_project(payload: ProjectCreate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
     # manager required
     if current.role != RoleEnum.manager:
         raise HTTPException(status_code=403, detail="Forbidden")
     project = Project(name=payload.name, description=payload.description)
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.commit()
+    await db.refresh(project)
     return project
 
 @router.get("/", response_model=List[ProjectOut])
-def list_projects(db: Session = Depends(get_db), current=Depends(get_current_user)):
-    projects = db.query(Project).all()
+async def list_projects(request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    etag = make_etag("projects", *(await db.execute(version_query(Project))).one())
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    set_validator(response.headers, etag)
+    projects = (await db.scalars(select(Project))).all()
     return projects
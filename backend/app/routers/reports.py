@@ -1,11 +1,89 @@
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
-from app.deps import get_db, get_current_user
-from app.services.report_service import defects_to_csv
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import datetime
+import os
+from app.deps import get_async_db, get_current_user
+from app.models import JobStatus, ReportJob, RoleEnum
+from app.schemas import DefectStats, ReportJobCreate, ReportJobOut
+from app.config import settings
+from app.services.job_runner import JOB_KINDS, JobLimitReached, JobQueueFull, job_runner
+from app.services.report_cache import cache_key, report_cache
+from app.services.report_service import defects_version, stream_defects_csv, defect_stats
+from app.utils.etag import if_none_match, make_etag, not_modified, set_validator
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
 @router.get("/defects/csv")
-def export_defects_csv(project_id: int = None, db: Session = Depends(get_db), current=Depends(get_current_user)):
-    csv_data = defects_to_csv(db, project_id=project_id)
-    return Response(content=csv_data, media_type="text/csv", headers={"Content-Disposition": "attachment; filename=defects.csv"})
+async def export_defects_csv(request: Request, project_id: int = None,
+                             db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    version = await db.run_sync(defects_version)
+    key = cache_key("defects_csv", {"project_id": project_id}, version)
+    etag = make_etag(key)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    headers = {"Content-Disposition": "attachment; filename=defects.csv"}
+    set_validator(headers, etag)
+    if not report_cache.enabled:
+        return StreamingResponse(stream_defects_csv(project_id=project_id), media_type="text/csv", headers=headers)
+    path = await run_in_threadpool(report_cache.get, key)
+    if path:
+        return FileResponse(path, media_type="text/csv", headers=headers)
+    # the data may change while streaming; the file then holds newer rows
+    # under an older version key, which no later request will ask for
+    body = report_cache.fill(key, stream_defects_csv(project_id=project_id))
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
+
+@router.get("/defects/stats", response_model=DefectStats)
+async def get_defect_stats(project_id: Optional[int] = None,
+                           date_from: Optional[datetime.datetime] = None,
+                           date_to: Optional[datetime.datetime] = None,
+                           db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    return await db.run_sync(defect_stats, project_id=project_id, date_from=date_from, date_to=date_to)
+
+@router.post("/jobs", response_model=ReportJobOut, status_code=202)
+async def create_report_job(payload: ReportJobCreate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    try:
+        job = await db.run_sync(job_runner.create_job, payload.kind, {"project_id": payload.project_id},
+                                current.id, settings.REPORT_JOB_MAX_ACTIVE_PER_USER)
+    except JobLimitReached as e:
+        raise HTTPException(429, str(e))
+    try:
+        job_runner.submit(job.id)
+    except JobQueueFull as e:
+        job.status, job.error = JobStatus.failed, str(e)
+        await db.commit()
+        raise HTTPException(429, str(e), headers={"Retry-After": "30"})
+    return job
+
+@router.get("/jobs", response_model=List[ReportJobOut])
+async def list_report_jobs(db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    stmt = select(ReportJob).where(ReportJob.created_by == current.id).order_by(ReportJob.id.desc()).limit(50)
+    return (await db.scalars(stmt)).all()
+
+async def get_visible_job(job_id: int, db: AsyncSession, current) -> ReportJob:
+    job = await db.get(ReportJob, job_id)
+    # other users' jobs are reported as missing rather than forbidden
+    if not job or (job.created_by != current.id and current.role not in (RoleEnum.manager, RoleEnum.admin)):
+        raise HTTPException(404, "Not found")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=ReportJobOut)
+async def get_report_job(job_id: int, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    return await get_visible_job(job_id, db, current)
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(job_id: int, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
+    job = await get_visible_job(job_id, db, current)
+    if job.status == JobStatus.expired:
+        raise HTTPException(410, "Report expired, start a new job")
+    if job.status != JobStatus.done:
+        raise HTTPException(409, f"Report is {job.status.value}")
+    if not job.result_path or not os.path.exists(job.result_path):
+        # removed from REPORT_DIR outside cleanup_expired (manual purge, another host's disk)
+        raise HTTPException(410, "Report file is no longer available, start a new job")
+    _, suffix, media_type = JOB_KINDS[job.kind]
+    return FileResponse(job.result_path, media_type=media_type, filename=f"{job.kind}-{job.id}{suffix}")
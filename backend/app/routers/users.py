@@ -1,28 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.deps import get_db, get_current_user
+from app.deps import get_async_db, get_db, get_current_user, invalidate_user
 from app.schemas import UserOut, UserCreate, UserUpdate
 from app.services.auth_service import create_user
 from app.models import RoleEnum, User
+from app.services.version_service import version_query
+from app.utils.etag import if_none_match, make_etag, not_modified, set_validator
+from app.utils.projection import parse_fields, rows_response, select_columns
 from pydantic import BaseModel
 
 router = APIRouter()
 
 @router.get("/", response_model=List[UserOut])
-def list_users(db: Session = Depends(get_db), current=Depends(get_current_user)):
+def list_users(request: Request,
+               fields: Optional[str] = Query(None, description="Comma-separated subset of UserOut fields"),
+               db: Session = Depends(get_db), current=Depends(get_current_user)):
     # only managers and admins can view full list
     if current.role not in [RoleEnum.manager, RoleEnum.admin]:
         raise HTTPException(status_code=403, detail="Forbidden")
-    users = db.query(User).all()
-    return users
+    names = parse_fields(fields, UserOut)
+    etag = make_etag("users", *db.execute(version_query(User)).one(), str(request.query_params))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    headers = {}
+    set_validator(headers, etag)
+    rows = db.execute(select(*select_columns(User, names)).order_by(User.id)).all()
+    return rows_response(rows, names, headers)
 
 @router.post("/", response_model=UserOut)
-def create_new_user(payload: UserCreate, db: Session = Depends(get_db), current=Depends(get_current_user)):
+async def create_new_user(payload: UserCreate, db: AsyncSession = Depends(get_async_db), current=Depends(get_current_user)):
     # Managers and admins can create users
     if current.role not in [RoleEnum.manager, RoleEnum.admin]:
         raise HTTPException(status_code=403, detail="Forbidden")
-    user = create_user(db, payload)
+    user = await create_user(db, payload)
     return user
 
 @router.get("/me", response_model=UserOut)
@@ -35,11 +48,14 @@ def update_current_user_info(
     db: Session = Depends(get_db), 
     current=Depends(get_current_user)
 ):
+    # current is a detached (possibly cached) instance; update the row in this session
+    user = db.get(User, current.id)
     for field, value in payload.dict(exclude_unset=True).items():
-        setattr(current, field, value)
+        setattr(user, field, value)
     db.commit()
-    db.refresh(current)
-    return current
+    db.refresh(user)
+    invalidate_user(user.username)
+    return user
 
 class RoleUpdatePayload(BaseModel):
     role: RoleEnum
@@ -69,6 +85,7 @@ def update_user_role(
     user.role = payload.role
     db.commit()
     db.refresh(user)
+    invalidate_user(user.username)
     return user
 
 @router.delete("/{user_id}")
@@ -89,6 +106,8 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current=Depends(get
     if user.role == RoleEnum.admin:
         raise HTTPException(status_code=400, detail="Нельзя удалять пользователей с ролью admin")
 
+    username = user.username
     db.delete(user)
     db.commit()
+    invalidate_user(username)
     return {"status": "ok"}
\ No newline at end of file
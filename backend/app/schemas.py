@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Optional, List, Dict
 import datetime
-from app.models import RoleEnum, DefectStatus
+import json
+from app.models import RoleEnum, DefectStatus, JobStatus
 
 class Token(BaseModel):
     access_token: str
@@ -64,6 +65,21 @@ class DefectUpdate(BaseModel):
     status: Optional[DefectStatus] = None
     assigned_to: Optional[int] = None
 
+class DefectFilter(BaseModel):
+    project_id: Optional[int] = None
+    status: Optional[DefectStatus] = None
+    assigned_to: Optional[int] = None
+
+class DefectBulkUpdate(BaseModel):
+    # exactly one of ids / filter selects the defects
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    filter: Optional[DefectFilter] = None
+    changes: DefectUpdate
+
+class DefectBulkResult(BaseModel):
+    updated: int
+    ids: List[int]
+
 class DefectOut(DefectBase):
     id: int
     status: DefectStatus
@@ -72,3 +88,65 @@ class DefectOut(DefectBase):
     model_config = {
         "from_attributes": True
     }
+
+class AttachmentOut(BaseModel):
+    id: int
+    defect_id: int
+    filename: str
+    sha256: str
+    size: int
+    mime: Optional[str] = None
+    created_by: Optional[int] = None
+    created_at: datetime.datetime
+    model_config = {
+        "from_attributes": True
+    }
+
+class DefectStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_project: Dict[str, int]
+    by_assignee: Dict[str, int]
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+
+class DefectChanges(BaseModel):
+    cursor: int
+    changes: List[DefectOut]
+    deleted: List[int]
+    has_more: bool
+
+class ReportJobCreate(BaseModel):
+    kind: str = Field("defects_csv", pattern="^defects_csv$")
+    project_id: Optional[int] = None
+
+class ReportJobOut(BaseModel):
+    id: int
+    kind: str
+    params: Dict[str, Any]
+    status: JobStatus
+    rows_done: int
+    rows_total: Optional[int] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    expires_at: Optional[datetime.datetime] = None
+    model_config = {
+        "from_attributes": True
+    }
+
+    @field_validator("params", mode="before")
+    @classmethod
+    def parse_params(cls, value):
+        # stored as JSON text on the job row
+        return json.loads(value) if isinstance(value, str) else value
@@ -1,23 +1,26 @@
 from app.models import User
-from app.utils.security import hash_password, verify_password, create_access_token
-from sqlalchemy.orm import Session
+from app.utils.security import create_access_token
+from app.utils.password_pool import password_pool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import UserCreate
 
-def create_user(db: Session, user_in: UserCreate):
+# async so bcrypt is awaited in the process pool instead of holding a worker thread
+async def create_user(db: AsyncSession, user_in: UserCreate):
     user = User(
         username=user_in.username,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=await password_pool.hash(user_in.password),
         role=user_in.role,
         full_name=user_in.full_name,
         email=getattr(user_in, "email", None)
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = db.query(User).filter(User.username == username).first()
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = (await db.scalars(select(User).where(User.username == username))).first()
     if not user:
         return None
     
@@ -27,7 +30,7 @@ def authenticate_user(db: Session, username: str, password: str):
         return {"user": user, "token": token}
     
     # Проверяем обычный bcrypt хеш
-    if verify_password(password, user.hashed_password):
+    if await password_pool.verify(password, user.hashed_password):
         token = create_access_token(user.username)
         return {"user": user, "token": token}
     
@@ -0,0 +1,43 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models import Defect, DefectEvent
+
+CHANGES_PAGE_SIZE = 1000
+
+
+def defect_event_rows(pairs):
+    """[(defect_id, project_id), ...] -> parameter rows for insert(DefectEvent)."""
+    return [{"defect_id": defect_id, "project_id": project_id} for defect_id, project_id in pairs]
+
+
+def record_defect_events(db: Session, pairs):
+    """Append one event per written defect; call inside the writing transaction."""
+    rows = defect_event_rows(pairs)
+    if rows:
+        db.execute(insert(DefectEvent), rows)
+
+
+def defect_changes(db: Session, since: int, project_id: int = None, limit: int = CHANGES_PAGE_SIZE):
+    """Current state of every defect written after `since`, plus tombstones for removed ones.
+
+    Events are read in seq order and collapsed per defect, so the cost is
+    O(changes) rather than O(table). Clients pass the returned cursor as
+    the next `since` and keep paging while has_more is set. With project_id,
+    a defect that has since moved to another project is a tombstone too.
+    Event writers are serialized (see DEFECT_EVENTS_ORDERED_POSTGRESQL), so
+    no event with a seq at or below a returned cursor can commit later.
+    """
+    events_stmt = select(DefectEvent.seq, DefectEvent.defect_id).where(DefectEvent.seq > since)
+    if project_id:
+        events_stmt = events_stmt.where(DefectEvent.project_id == project_id)
+    events = db.execute(events_stmt.order_by(DefectEvent.seq).limit(limit)).all()
+    if not events:
+        return {"cursor": since, "changes": [], "deleted": [], "has_more": False}
+
+    ids = {defect_id for _, defect_id in events}
+    stmt = select(Defect).where(Defect.id.in_(ids))
+    if project_id:
+        stmt = stmt.where(Defect.project_id == project_id)
+    defects = db.scalars(stmt.order_by(Defect.id)).all()
+    deleted = sorted(ids - {d.id for d in defects})
+    return {"cursor": events[-1].seq, "changes": defects, "deleted": deleted, "has_more": len(events) == limit}
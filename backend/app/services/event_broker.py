@@ -0,0 +1,102 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Optional
+
+from app.config import settings
+
+
+class Subscription:
+    def __init__(self, project_id: Optional[int], maxsize: int):
+        self.project_id = project_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+
+class EventBroker:
+    """In-process fan-out of defect events to live subscribers.
+
+    Each subscriber gets its own bounded queue. publish() never waits: a
+    subscriber whose queue is full is dropped instead of buffering without
+    limit, and is expected to reconnect and catch up via /defects/changes.
+    All methods must be called from the event loop.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        # project_id -> subscribers; the None key holds subscribers to every project
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, project_id: Optional[int] = None) -> Subscription:
+        sub = Subscription(project_id, self.queue_size)
+        self._subscribers[project_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._subscribers.get(sub.project_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.project_id]
+
+    def publish(self, event: dict):
+        self.published += 1
+        targets = self._subscribers.get(event.get("project_id"), set()) | self._subscribers.get(None, set())
+        for sub in targets:
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.dropped = True
+                self.dropped += 1
+                self.unsubscribe(sub)
+
+    def publish_all(self, events):
+        for event in events:
+            self.publish(event)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+def defect_event(kind: str, defect) -> dict:
+    return {
+        "type": kind,
+        "defect_id": defect.id,
+        "project_id": defect.project_id,
+        "status": defect.status.value,
+        "assigned_to": defect.assigned_to,
+    }
+
+
+def import_events(rows) -> list:
+    """One "import" event per project for a committed batch of (id, project_id) rows."""
+    by_project = defaultdict(list)
+    for defect_id, project_id in rows:
+        by_project[project_id].append(defect_id)
+    return [{"type": "import", "project_id": project_id, "defect_ids": ids} for project_id, ids in by_project.items()]
+
+
+async def sse_stream(request, sub: Subscription, heartbeat: float):
+    """Server-Sent Events body for one subscription, with comment heartbeats."""
+    try:
+        yield "retry: 5000\n\n"
+        while not sub.dropped:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        broker.unsubscribe(sub)
+
+
+broker = EventBroker(settings.EVENTS_QUEUE_SIZE)
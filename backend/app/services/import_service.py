@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Defect, Project, User
+from app.schemas import DefectCreate
+from app.services.change_service import record_defect_events
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def _iter_csv(text):
+    # line 1 is the header
+    for line_no, row in enumerate(csv.DictReader(text), start=2):
+        yield line_no, {k: v for k, v in row.items() if k is not None and v != ""}
+
+
+def _iter_ndjson(text):
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def _existing_ids(db: Session, model, ids, known: set, missing: set):
+    """Resolve ids against the table, querying only ones not seen in earlier batches."""
+    unseen = {i for i in ids if i is not None} - known - missing
+    if unseen:
+        found = set(db.scalars(select(model.id).where(model.id.in_(unseen))))
+        known |= found
+        missing |= unseen - found
+
+
+def import_defects(db: Session, fileobj, fmt: str, created_by: int, batch_size: int = IMPORT_BATCH_SIZE,
+                   on_commit=None):
+    """Stream-parse a CSV/NDJSON file and insert valid rows in batched executemany transactions.
+
+    Every row is validated against DefectCreate; project and assignee ids are
+    resolved with one IN query per batch. Each batch commits on its own, so a
+    bad row never rolls back rows that were already accepted. on_commit, if
+    given, is called with the batch's (id, project_id) rows after each commit.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    rows = _iter_csv(text) if fmt == "csv" else _iter_ndjson(text)
+    report = {"inserted": 0, "failed": 0, "errors": []}
+    known_projects, missing_projects = set(), set()
+    known_users, missing_users = set(), set()
+
+    def fail(line_no, message):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": line_no, "error": message})
+
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            valid = []
+            for line_no, raw in batch:
+                if isinstance(raw, Exception):
+                    fail(line_no, f"Invalid JSON: {raw}")
+                    continue
+                try:
+                    valid.append((line_no, DefectCreate.model_validate(raw)))
+                except ValidationError as e:
+                    fail(line_no, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+
+            _existing_ids(db, Project, {p.project_id for _, p in valid}, known_projects, missing_projects)
+            _existing_ids(db, User, {p.assigned_to for _, p in valid}, known_users, missing_users)
+            values = []
+            for line_no, payload in valid:
+                if payload.project_id in missing_projects:
+                    fail(line_no, f"Project {payload.project_id} not found")
+                elif payload.assigned_to in missing_users:
+                    fail(line_no, f"User {payload.assigned_to} not found")
+                else:
+                    values.append({
+                        "title": payload.title,
+                        "description": payload.description,
+                        "priority": payload.priority or 3,
+                        "project_id": payload.project_id,
+                        "assigned_to": payload.assigned_to,
+                        "created_by": created_by,
+                    })
+            if values:
+                written = db.execute(insert(Defect).returning(Defect.id, Defect.project_id), values).all()
+                record_defect_events(db, written)
+                db.commit()
+                report["inserted"] += len(values)
+                if on_commit:
+                    on_commit(written)
+    finally:
+        # don't let the wrapper close the caller's file
+        text.detach()
+    report["errors"].sort(key=lambda e: e["row"])
+    return report
+
+
+def run_import(fileobj, fmt: str, created_by: int, batch_size: int = IMPORT_BATCH_SIZE, on_commit=None):
+    """import_defects with its own session, for running in the threadpool.
+
+    Parsing and inserts are synchronous; through AsyncSession.run_sync they
+    would run on the event loop and stall every other request.
+    """
+    db = SessionLocal()
+    try:
+        return import_defects(db, fileobj, fmt, created_by, batch_size=batch_size, on_commit=on_commit)
+    finally:
+        db.close()
@@ -0,0 +1,230 @@
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import create_db_engine
+from app.models import JobStatus, ReportJob, User
+from app.services.report_service import count_defects, iter_defects_csv
+
+logger = logging.getLogger("app.jobs")
+
+ACTIVE_STATUSES = (JobStatus.queued, JobStatus.running)
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobLimitReached(Exception):
+    pass
+
+
+def run_defects_csv(db: Session, job: ReportJob, path: str, progress: Callable[[int], None]):
+    params = json.loads(job.params)
+    project_id = params.get("project_id")
+    job.rows_total = count_defects(db, project_id=project_id)
+    db.commit()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_defects_csv(db, project_id=project_id, on_batch=progress):
+            f.write(chunk)
+
+
+# kind -> (handler, file suffix, media type)
+JOB_KINDS: Dict[str, tuple] = {
+    "defects_csv": (run_defects_csv, ".csv", "text/csv"),
+}
+
+
+class JobRunner:
+    """Runs report jobs on a bounded thread pool with its own small DB pool.
+
+    The job row is the source of truth (status, progress, result path), so
+    any worker process can answer status and download requests; the
+    in-process part is just the executor and the queue bound.
+    """
+
+    def __init__(self, workers: int, max_queued: int):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._live: set = set()  # queued or running job ids accepted by this process
+        self._sessions: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+
+    def session(self) -> Session:
+        if self._sessions is None:
+            with self._lock:
+                if self._sessions is None:
+                    # a running job holds its streaming session and briefly a second one
+                    # for progress writes; one more for lease renewal and cleanup.
+                    # Never interactive connections.
+                    db_engine = create_db_engine(settings.DATABASE_URL, pool_size=2 * self.workers + 1,
+                                                 max_overflow=0)
+                    self._sessions = sessionmaker(bind=db_engine, autoflush=False, expire_on_commit=False)
+        return self._sessions()
+
+    def submit(self, job_id: int):
+        with self._lock:
+            if self.pending >= self.max_queued:
+                raise JobQueueFull("Too many report jobs queued, try again later")
+            self.pending += 1
+            self._live.add(job_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report-job")
+            if self._heartbeat is None:
+                self._stopping.clear()
+                self._heartbeat = threading.Thread(target=self._renew_loop, name="report-job-lease", daemon=True)
+                self._heartbeat.start()
+        self._executor.submit(self._run, job_id)
+
+    def _renew_loop(self):
+        while not self._stopping.wait(settings.REPORT_JOB_HEARTBEAT_SECONDS):
+            try:
+                self.renew_leases()
+            except Exception:
+                logger.exception("renewing report job leases failed")
+
+    def renew_leases(self) -> int:
+        """Push heartbeat_at forward for every job this process still owes a result."""
+        with self._lock:
+            ids = list(self._live)
+        if not ids:
+            return 0
+        with self.session() as db:
+            result = db.execute(update(ReportJob).where(ReportJob.id.in_(ids), ReportJob.status.in_(ACTIVE_STATUSES))
+                                .values(heartbeat_at=datetime.datetime.utcnow()))
+            db.commit()
+        return result.rowcount
+
+    def _run(self, job_id: int):
+        db = self.session()
+        try:
+            job = db.get(ReportJob, job_id)
+            handler, suffix, _ = JOB_KINDS[job.kind]
+            job.status = JobStatus.running
+            job.started_at = job.heartbeat_at = datetime.datetime.utcnow()
+            db.commit()
+
+            os.makedirs(settings.REPORT_DIR, exist_ok=True)
+            path = os.path.join(settings.REPORT_DIR, f"job-{job_id}{suffix}")
+            done, flushed = 0, time.monotonic()
+
+            def progress(rows: int):
+                nonlocal done, flushed
+                done += rows
+                if time.monotonic() - flushed >= PROGRESS_FLUSH_SECONDS:
+                    self._set_progress(job_id, done)
+                    flushed = time.monotonic()
+
+            try:
+                handler(db, job, path + ".tmp", progress)
+                os.replace(path + ".tmp", path)
+            except Exception as e:
+                db.rollback()
+                if os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+                logger.exception("report job %s failed", job_id)
+                job.status, job.error = JobStatus.failed, str(e) or type(e).__name__
+            else:
+                job.status = JobStatus.done
+                job.result_path, job.size = path, os.path.getsize(path)
+                job.expires_at = datetime.datetime.utcnow() + datetime.timedelta(
+                    seconds=settings.REPORT_JOB_RESULT_TTL_SECONDS)
+            job.rows_done = done
+            job.finished_at = datetime.datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+            with self._lock:
+                self.pending -= 1
+                self._live.discard(job_id)
+
+    def _set_progress(self, job_id: int, rows_done: int):
+        # separate short transaction: the job's own session is busy streaming rows
+        with self.session() as db:
+            db.execute(update(ReportJob).where(ReportJob.id == job_id)
+                       .values(rows_done=rows_done, heartbeat_at=datetime.datetime.utcnow()))
+            db.commit()
+
+    def create_job(self, db: Session, kind: str, params: dict, user_id: int, max_active: int) -> ReportJob:
+        """Insert a queued job unless the user already has ``max_active`` in progress.
+
+        The limit check and the insert share one transaction: the user's row
+        is locked first (a no-op on SQLite, where the insert takes the
+        database write lock before the count runs), so concurrent requests
+        cannot both pass it. Both reads go to the writer connection, so with
+        SQLITE_SEPARATE_WRITER the count sees the uncommitted insert.
+        """
+        on_writer = {"writer": True}
+        db.execute(select(User.id).where(User.id == user_id).with_for_update(), bind_arguments=on_writer)
+        job = ReportJob(kind=kind, params=json.dumps(params), created_by=user_id, heartbeat_at=datetime.datetime.utcnow())
+        db.add(job)
+        db.flush()
+        stmt = select(func.count()).where(ReportJob.created_by == user_id, ReportJob.status.in_(ACTIVE_STATUSES))
+        if db.execute(stmt, bind_arguments=on_writer).scalar_one() > max_active:
+            db.rollback()
+            raise JobLimitReached("Too many report jobs in progress")
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def cleanup_expired(self, now: Optional[datetime.datetime] = None) -> int:
+        """Delete result files past expires_at and mark their jobs expired."""
+        now = now or datetime.datetime.utcnow()
+        with self.session() as db:
+            jobs = db.scalars(select(ReportJob).where(ReportJob.status == JobStatus.done,
+                                                      ReportJob.expires_at < now)).all()
+            for job in jobs:
+                if job.result_path and os.path.exists(job.result_path):
+                    os.remove(job.result_path)
+                job.status, job.result_path = JobStatus.expired, None
+            db.commit()
+        return len(jobs)
+
+    def fail_stale(self, now: Optional[datetime.datetime] = None) -> int:
+        """Fail queued/running jobs whose lease ran out.
+
+        The process that accepted a job renews its heartbeat_at every
+        REPORT_JOB_HEARTBEAT_SECONDS until the job finishes, so a lease older
+        than REPORT_JOB_LEASE_SECONDS means that process is gone (crash,
+        restart, a container replaced under a new hostname) and the job will
+        never finish. Runs at startup and with the periodic cleanup.
+        """
+        now = now or datetime.datetime.utcnow()
+        deadline = now - datetime.timedelta(seconds=settings.REPORT_JOB_LEASE_SECONDS)
+        with self.session() as db:
+            result = db.execute(
+                update(ReportJob)
+                .where(ReportJob.status.in_(ACTIVE_STATUSES),
+                       or_(ReportJob.heartbeat_at < deadline, ReportJob.heartbeat_at.is_(None)))
+                .values(status=JobStatus.failed, error="Interrupted: the worker running it stopped",
+                        finished_at=now)
+            )
+            db.commit()
+        return result.rowcount
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": self.pending, "max_queued": self.max_queued}
+
+    def shutdown(self):
+        self._stopping.set()
+        self._heartbeat = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+job_runner = JobRunner(workers=settings.REPORT_JOB_WORKERS, max_queued=settings.REPORT_JOB_MAX_QUEUED)
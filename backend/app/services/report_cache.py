@@ -0,0 +1,144 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from app.config import settings
+
+
+def cache_key(kind: str, filters: dict, version) -> str:
+    """Stable key for one report: same kind, filters and data version -> same file."""
+    raw = json.dumps([kind, filters, version], sort_keys=True, default=str)
+    return f"{kind}-{hashlib.sha256(raw.encode()).hexdigest()[:32]}"
+
+
+class ReportCache:
+    """Generated report files on disk, keyed by (kind, filters, data version).
+
+    The data version is part of the key, so entries are never invalidated,
+    only evicted: least recently used first, once the directory holds more
+    than max_entries files or max_bytes in total. Files are written to a
+    temp name and renamed into place only when complete, so a reader never
+    sees a partial report. Recency is the file mtime (touched on every hit),
+    which lets a restarted process rebuild the LRU order from the directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_entries: int, suffix: str = ".csv"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.suffix = suffix
+        self.hits = self.misses = self.evictions = 0
+        self.bytes = 0
+        self._index: Optional[OrderedDict] = None  # key -> size, oldest first
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.max_entries > 0
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _load(self):
+        # caller holds the lock
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(self.suffix) and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-len(self.suffix)], stat.st_size))
+        self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+        self.bytes = sum(self._index.values())
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached report, or None. Counts a hit or a miss."""
+        path = self.path(key)
+        with self._lock:
+            self._load()
+            try:
+                os.utime(path)
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                # evicted by another worker process sharing the directory
+                if self._index.pop(key, None) is not None:
+                    self.bytes = sum(self._index.values())
+                self.misses += 1
+                return None
+            if key not in self._index:
+                # written by another worker process
+                self.bytes += size
+            self._index[key] = size
+            self._index.move_to_end(key)
+            self.hits += 1
+        return path
+
+    def fill(self, key: str, chunks: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through while writing them to the cache.
+
+        The entry is published only if the stream runs to the end; an error
+        or a client disconnect (generator closed early) discards the temp
+        file. A generator passed as chunks is closed either way, releasing its
+        DB session.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".fill-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    yield chunk
+            self._publish(key, tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+    def _publish(self, key: str, tmp_path: str):
+        size = os.path.getsize(tmp_path)
+        if size > self.max_bytes:
+            os.remove(tmp_path)
+            return
+        with self._lock:
+            self._load()
+            os.replace(tmp_path, self.path(key))
+            self.bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self._evict()
+
+    def _evict(self):
+        # caller holds the lock
+        while self._index and (self.bytes > self.max_bytes or len(self._index) > self.max_entries):
+            key, size = self._index.popitem(last=False)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path(key))
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            for key in self._index:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.path(key))
+            self._index.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._index) if self._index is not None else 0
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries,
+                    "bytes": self.bytes, "max_bytes": self.max_bytes, "max_entries": self.max_entries}
+
+
+report_cache = ReportCache(settings.REPORT_CACHE_DIR, max_bytes=settings.REPORT_CACHE_MAX_BYTES,
+                           max_entries=settings.REPORT_CACHE_MAX_ENTRIES)
@@ -1,18 +1,97 @@
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from app.database import SessionLocal
 from app.models import Defect, Project
+from app.services.version_service import version_query
 import csv
+import datetime
 from io import StringIO
 
-def defects_to_csv(db: Session, project_id: int = None):
-    query = db.query(Defect)
+CSV_COLUMNS = (
+    Defect.id, Defect.title, Defect.description, Defect.status, Defect.priority,
+    Defect.project_id, Defect.assigned_to, Defect.created_at, Defect.updated_at,
+)
+CSV_HEADER = [c.key for c in CSV_COLUMNS]
+CSV_BATCH_SIZE = 1000
+
+def iter_defects_csv(db: Session, project_id: int = None, batch_size: int = CSV_BATCH_SIZE, on_batch=None):
+    """Yield the defects CSV one chunk per batch of rows.
+
+    Rows are fetched as plain column tuples with yield_per (a server-side
+    cursor on PostgreSQL), so memory use depends on batch_size only.
+    on_batch, if given, is called with the row count of each batch.
+    """
+    stmt = select(*CSV_COLUMNS).order_by(Defect.id).execution_options(yield_per=batch_size)
     if project_id:
-        query = query.filter(Defect.project_id == project_id)
-    defects = query.all()
+        stmt = stmt.where(Defect.project_id == project_id)
 
     out = StringIO()
     writer = csv.writer(out)
-    writer.writerow(["id", "title", "description", "status", "priority", "project_id", "assigned_to", "created_at", "updated_at"])
-    for d in defects:
-        writer.writerow([d.id, d.title, d.description, d.status.value, d.priority, d.project_id, d.assigned_to, d.created_at, d.updated_at])
+    writer.writerow(CSV_HEADER)
+    yield _drain(out)
+    for rows in db.execute(stmt).partitions():
+        writer.writerows(
+            (d_id, title, description, status.value, priority, pid, assigned_to, created_at, updated_at)
+            for d_id, title, description, status, priority, pid, assigned_to, created_at, updated_at in rows
+        )
+        if on_batch:
+            on_batch(len(rows))
+        yield _drain(out)
+
+def stream_defects_csv(project_id: int = None, batch_size: int = CSV_BATCH_SIZE):
+    """iter_defects_csv with its own session, for use as a StreamingResponse body.
+
+    The request-scoped session from get_db is closed before the response
+    body is sent, so the stream cannot borrow it.
+    """
+    db = SessionLocal()
+    try:
+        yield from iter_defects_csv(db, project_id=project_id, batch_size=batch_size)
+    finally:
+        db.close()
+
+def count_defects(db: Session, project_id: int = None) -> int:
+    stmt = select(func.count()).select_from(Defect)
+    if project_id:
+        stmt = stmt.where(Defect.project_id == project_id)
+    return db.execute(stmt).scalar_one()
+
+def defects_version(db: Session) -> tuple:
+    """Data version of the defects table; exports for any project share it."""
+    return tuple(db.execute(version_query(Defect)).one())
+
+def defects_to_csv(db: Session, project_id: int = None):
+    return "".join(iter_defects_csv(db, project_id=project_id))
+
+def _drain(out: StringIO) -> str:
+    chunk = out.getvalue()
     out.seek(0)
-    return out.getvalue()
+    out.truncate()
+    return chunk
+
+def defect_stats(db: Session, project_id: int = None,
+                 date_from: datetime.datetime = None, date_to: datetime.datetime = None):
+    """Counts by status, priority, project and assignee.
+
+    A single GROUP BY over all four columns returns one row per distinct
+    combination; the per-dimension totals are folded from that in Python.
+    """
+    query = db.query(
+        Defect.status, Defect.priority, Defect.project_id, Defect.assigned_to, func.count(Defect.id)
+    )
+    if project_id:
+        query = query.filter(Defect.project_id == project_id)
+    if date_from:
+        query = query.filter(Defect.created_at >= date_from)
+    if date_to:
+        query = query.filter(Defect.created_at < date_to)
+    query = query.group_by(Defect.status, Defect.priority, Defect.project_id, Defect.assigned_to)
+
+    stats = {"total": 0, "by_status": {}, "by_priority": {}, "by_project": {}, "by_assignee": {}}
+    for status, priority, pid, assignee, count in query:
+        stats["total"] += count
+        for bucket, key in (("by_status", status.value), ("by_priority", str(priority)),
+                            ("by_project", str(pid)),
+                            ("by_assignee", str(assignee) if assignee is not None else "unassigned")):
+            stats[bucket][key] = stats[bucket].get(key, 0) + count
+    return stats
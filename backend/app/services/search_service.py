@@ -0,0 +1,38 @@
+import re
+from sqlalchemy import column, func, literal_column, or_, select, table, text
+from sqlalchemy.orm import Session
+from app.models import Defect
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+defects_fts = table("defects_fts", column("rowid"))
+
+
+def fts5_query(q: str) -> str:
+    """Turn free user input into a safe FTS5 query: every word quoted, prefix-matched, ANDed."""
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(q))
+
+
+def search_defects(db: Session, q: str, project_id: int = None, limit: int = 50, offset: int = 0):
+    """Ranked full-text search over defect title and description."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = fts5_query(q)
+        if not match:
+            return []
+        stmt = (
+            select(Defect)
+            .join(defects_fts, defects_fts.c.rowid == Defect.id)
+            .where(text("defects_fts MATCH :match").bindparams(match=match))
+            .order_by(text("bm25(defects_fts)"), Defect.id)
+        )
+    elif dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("simple", q)
+        vector = literal_column("defects.search_vector")
+        stmt = select(Defect).where(vector.op("@@")(tsquery)).order_by(func.ts_rank(vector, tsquery).desc(), Defect.id)
+    else:
+        # no index available: unranked substring match
+        pattern = f"%{q}%"
+        stmt = select(Defect).where(or_(Defect.title.ilike(pattern), Defect.description.ilike(pattern))).order_by(Defect.id)
+    if project_id:
+        stmt = stmt.where(Defect.project_id == project_id)
+    return db.scalars(stmt.limit(limit).offset(offset)).all()
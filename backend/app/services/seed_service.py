@@ -0,0 +1,180 @@
+import csv
+import datetime
+import io
+import itertools
+import random
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app.models import Defect, DefectEvent, DefectStatus, Project, RoleEnum, User
+from app.utils.security import hash_password
+
+SEED_BATCH_SIZE = 10_000
+
+# the accounts listed in the README
+DEMO_USERS = [
+    {"username": "admin", "password": "admin123", "role": RoleEnum.admin, "full_name": "Администратор", "email": "admin@test.com"},
+    {"username": "manager", "password": "admin123", "role": RoleEnum.manager, "full_name": "Менеджер", "email": "manager@test.com"},
+    {"username": "engineer", "password": "user123", "role": RoleEnum.engineer, "full_name": "Инженер", "email": "engineer@test.com"},
+    {"username": "observer", "password": "view123", "role": RoleEnum.observer, "full_name": "Наблюдатель", "email": "observer@test.com"},
+]
+
+ROLE_WEIGHTS = {RoleEnum.manager: 1, RoleEnum.engineer: 6, RoleEnum.observer: 3}
+STATUS_WEIGHTS = {
+    DefectStatus.new: 30, DefectStatus.in_progress: 25, DefectStatus.review: 15,
+    DefectStatus.closed: 25, DefectStatus.canceled: 5,
+}
+PRIORITY_WEIGHTS = {1: 10, 2: 20, 3: 40, 4: 20, 5: 10}
+UNASSIGNED_SHARE = 0.15
+WORDS = (
+    "трещина", "протечка", "коррозия", "перекос", "скол", "зазор", "плесень", "шум",
+    "crack", "leak", "rust", "tilt", "gap", "stain", "mold", "draft",
+)
+PLACES = ("фасад", "кровля", "подвал", "лестница", "этаж 3", "лифт", "парковка", "окно")
+DEFECT_COLUMNS = ("title", "description", "priority", "status", "project_id", "assigned_to",
+                  "created_by", "created_at", "updated_at")
+
+
+def _zipf_cum_weights(size: int, exponent: float = 0.8) -> List[float]:
+    """Cumulative Zipf weights: a few projects/assignees get most of the defects, like real data."""
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(size)))
+
+
+def _hashes(passwords) -> Dict[str, str]:
+    # bcrypt is the slow part of user creation; hash each distinct password once
+    return {password: hash_password(password) for password in set(passwords)}
+
+
+def seed_demo_users(conn) -> int:
+    existing = set(conn.execute(select(User.username).where(User.username.in_([u["username"] for u in DEMO_USERS]))).scalars())
+    missing = [u for u in DEMO_USERS if u["username"] not in existing]
+    if not missing:
+        return 0
+    hashes = _hashes(u["password"] for u in missing)
+    now = datetime.datetime.utcnow()
+    conn.execute(insert(User), [
+        {"username": u["username"], "hashed_password": hashes[u["password"]], "role": u["role"],
+         "full_name": u["full_name"], "email": u["email"], "is_active": True, "created_at": now, "updated_at": now}
+        for u in missing
+    ])
+    return len(missing)
+
+
+def seed_users(conn, count: int, password: str, rnd: random.Random) -> int:
+    if count <= 0:
+        return 0
+    start = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+    hashed = _hashes([password])[password]
+    roles, weights = list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values())
+    now = datetime.datetime.utcnow()
+    for offset in range(0, count, SEED_BATCH_SIZE):
+        conn.execute(insert(User), [
+            {"username": f"user{start + i}", "hashed_password": hashed, "role": rnd.choices(roles, weights)[0],
+             "full_name": f"Пользователь {start + i}", "email": f"user{start + i}@example.com",
+             "is_active": True, "created_at": now, "updated_at": now}
+            for i in range(offset, min(offset + SEED_BATCH_SIZE, count))
+        ])
+    return count
+
+
+def seed_projects(conn, count: int) -> int:
+    if count <= 0:
+        return 0
+    start = (conn.execute(select(func.max(Project.id))).scalar() or 0) + 1
+    now = datetime.datetime.utcnow()
+    conn.execute(insert(Project), [
+        {"name": f"Объект {start + i}", "description": f"Сгенерированный проект {start + i}",
+         "created_at": now, "updated_at": now}
+        for i in range(count)
+    ])
+    return count
+
+
+def defect_rows(count: int, project_ids: List[int], assignee_ids: List[int], author_ids: List[int],
+                rnd: random.Random):
+    """Yield `count` defect dicts with weighted status/priority and long-tailed project/assignee."""
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    priorities, priority_weights = list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values())
+    # shuffle once so the "popular" ids are not simply the lowest ones
+    project_ids, assignee_ids = rnd.sample(project_ids, len(project_ids)), rnd.sample(assignee_ids, len(assignee_ids))
+    project_weights, assignee_weights = _zipf_cum_weights(len(project_ids)), _zipf_cum_weights(len(assignee_ids))
+    now = datetime.datetime.utcnow()
+    for i in range(count):
+        created = now - datetime.timedelta(minutes=rnd.randrange(2 * 525_600))
+        updated = created + datetime.timedelta(minutes=rnd.randrange(int((now - created).total_seconds() // 60) + 1))
+        a, b = rnd.sample(WORDS, 2)
+        assigned = None
+        if assignee_ids and rnd.random() >= UNASSIGNED_SHARE:
+            assigned = rnd.choices(assignee_ids, cum_weights=assignee_weights)[0]
+        yield {
+            "title": f"{a.capitalize()}: {rnd.choice(PLACES)} #{i + 1}",
+            "description": f"{a} {b}, {rnd.choice(PLACES)}",
+            "priority": rnd.choices(priorities, priority_weights)[0],
+            "status": rnd.choices(statuses, status_weights)[0],
+            "project_id": rnd.choices(project_ids, cum_weights=project_weights)[0],
+            "assigned_to": assigned,
+            "created_by": rnd.choice(author_ids) if author_ids else None,
+            "created_at": created,
+            "updated_at": updated,
+        }
+
+
+def _copy_defects(conn, batch: List[dict]):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in batch:
+        writer.writerow(["" if row[c] is None else getattr(row[c], "name", row[c]) for c in DEFECT_COLUMNS])
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        # unquoted empty fields are NULL in CSV mode
+        cursor.copy_expert(f"COPY defects ({', '.join(DEFECT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+
+def seed_defects(db_engine, count: int, rnd: random.Random, batch_size: int = SEED_BATCH_SIZE,
+                 progress: Optional[Callable[[int], None]] = None) -> int:
+    if count <= 0:
+        return 0
+    with db_engine.connect() as conn:
+        project_ids = conn.execute(select(Project.id)).scalars().all()
+        users = conn.execute(select(User.id, User.role)).all()
+    if not project_ids or not users:
+        raise ValueError("Seed projects and users before defects")
+    assignee_ids = [u.id for u in users if u.role == RoleEnum.engineer] or [u.id for u in users]
+    author_ids = [u.id for u in users]
+    use_copy = db_engine.dialect.name == "postgresql" and db_engine.dialect.driver == "psycopg2"
+
+    rows = defect_rows(count, project_ids, assignee_ids, author_ids, rnd)
+    done = 0
+    while done < count:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        # one transaction per batch keeps memory and lock time flat
+        with db_engine.begin() as conn:
+            last_id = conn.execute(select(func.max(Defect.id))).scalar() or 0
+            if use_copy:
+                _copy_defects(conn, batch)
+            else:
+                conn.execute(insert(Defect), batch)
+            # log the batch like any other write, so change feeds and ETags see it
+            new_rows = select(Defect.id, Defect.project_id, Defect.updated_at).where(Defect.id > last_id).order_by(Defect.id)
+            conn.execute(insert(DefectEvent).from_select(["defect_id", "project_id", "created_at"], new_rows))
+        done += len(batch)
+        if progress:
+            progress(done)
+    return done
+
+
+def seed_database(db_engine, users: int = 0, projects: int = 0, defects: int = 0, password: str = "userpass",
+                  demo: bool = True, seed: int = 42, batch_size: int = SEED_BATCH_SIZE, progress=None) -> dict:
+    rnd = random.Random(seed)
+    with db_engine.begin() as conn:
+        created = {
+            "demo_users": seed_demo_users(conn) if demo else 0,
+            "users": seed_users(conn, users, password, rnd),
+            "projects": seed_projects(conn, projects),
+        }
+    created["defects"] = seed_defects(db_engine, defects, rnd, batch_size=batch_size, progress=progress)
+    return created
@@ -0,0 +1,17 @@
+from sqlalchemy import func, select
+
+from app.models import Defect, DefectEvent, TableVersion
+
+
+def version_query(model):
+    """Data-version probe for a whole table, one index lookup at any table size.
+
+    Defects use the newest change-log seq, which every write (removals and
+    moves included) advances; other tables a counter their triggers bump.
+    The version is per table, not per filter: any write changes the ETag of
+    every list over that table, which costs a re-fetch, never a stale 304.
+    """
+    if model is Defect:
+        return select(func.coalesce(func.max(DefectEvent.seq), 0))
+    counter = select(TableVersion.version).where(TableVersion.table_name == model.__tablename__)
+    return select(func.coalesce(counter.scalar_subquery(), 0))
@@ -0,0 +1,30 @@
+import hashlib
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag derived from the given validator parts."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def set_validator(headers, etag: str):
+    headers["ETag"] = etag
+    # let browsers keep the body but revalidate on every request
+    headers["Cache-Control"] = "private, no-cache"
@@ -1,16 +1,149 @@
+import hashlib
 import os
-from fastapi import UploadFile
-from uuid import uuid4
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
 
-UPLOAD_DIR = "uploads"
+# Allowance for boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-async def save_upload(file: UploadFile) -> str:
-    ext = os.path.splitext(file.filename)[1]
-    filename = f"{uuid4().hex}{ext}"
-    path = os.path.join(UPLOAD_DIR, filename)
-    with open(path, "wb") as out:
-        content = await file.read()
-        out.write(content)
-    return path
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidUpload(Exception):
+    pass
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+@dataclass
+class ReceivedUpload(StoredUpload):
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+
+
+def content_path(sha256: str) -> str:
+    # fan out by hash prefix so no single directory grows unbounded
+    return os.path.join(settings.UPLOAD_DIR, sha256[:2], sha256)
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _publish(tmp_path: str, final_path: str) -> bool:
+    """Move a finished upload into the content store; True if it was already there."""
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        return True
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+    return False
+
+
+def _feed(parser: MultipartParser, chunk: Optional[bytes]):
+    try:
+        if chunk is None:
+            parser.finalize()
+        else:
+            parser.write(chunk)
+    except MultipartParseError as e:
+        raise InvalidUpload(f"Malformed multipart body: {e}")
+
+
+async def receive_upload(request: Request, field: str = "file") -> ReceivedUpload:
+    """Parse a multipart body as it streams in and store its ``field`` file part.
+
+    Starlette's form parser spools the whole body before the handler runs, so
+    the limit is enforced here instead: a declared Content-Length over it is
+    refused before any body is read, and the file part is counted while it
+    arrives, so an oversized upload stops at UPLOAD_MAX_BYTES. Part data is
+    buffered up to UPLOAD_CHUNK_BYTES and hashed/written in the threadpool.
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise InvalidUpload("Expected a multipart/form-data body")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD_BYTES:
+        raise UploadTooLarge(f"Request body exceeds {settings.UPLOAD_MAX_BYTES} bytes")
+
+    events = []
+    parser = MultipartParser(boundary, {
+        "on_part_begin": lambda: events.append(("begin", b"")),
+        "on_header_field": lambda data, start, end: events.append(("field", data[start:end])),
+        "on_header_value": lambda data, start, end: events.append(("value", data[start:end])),
+        "on_header_end": lambda: events.append(("header_end", b"")),
+        "on_headers_finished": lambda: events.append(("headers_done", b"")),
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end", b"")),
+    })
+
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.UPLOAD_DIR, prefix=".upload-")
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    headers, header_field, header_value = {}, b"", b""
+    in_file, found = False, None  # found: (filename, content type) of the stored part
+    try:
+        with os.fdopen(fd, "wb") as out:
+            async for chunk in request.stream():
+                _feed(parser, chunk)
+                for kind, data in events:
+                    if kind == "begin":
+                        headers, header_field, header_value = {}, b"", b""
+                    elif kind == "field":
+                        header_field += data
+                    elif kind == "value":
+                        header_value += data
+                    elif kind == "header_end":
+                        headers[header_field.lower()] = header_value
+                        header_field, header_value = b"", b""
+                    elif kind == "headers_done":
+                        _, params = parse_options_header(headers.get(b"content-disposition", b""))
+                        # only the first part named `field` is stored; other fields are skipped
+                        in_file = found is None and params.get(b"name") == field.encode()
+                        if in_file:
+                            found = (params.get(b"filename", b"").decode("utf-8", "replace") or None,
+                                     headers.get(b"content-type", b"").decode("latin-1") or None)
+                    elif kind == "data" and in_file:
+                        size += len(data)
+                        if size > settings.UPLOAD_MAX_BYTES:
+                            raise UploadTooLarge(f"File exceeds {settings.UPLOAD_MAX_BYTES} bytes")
+                        buffer += data
+                        if len(buffer) >= settings.UPLOAD_CHUNK_BYTES:
+                            await run_in_threadpool(_write_chunk, out, digest, bytes(buffer))
+                            buffer.clear()
+                    elif kind == "end":
+                        in_file = False
+                events.clear()
+            _feed(parser, None)
+            if found is None:
+                raise InvalidUpload(f"Missing '{field}' file part")
+            if buffer:
+                await run_in_threadpool(_write_chunk, out, digest, bytes(buffer))
+        sha256 = digest.hexdigest()
+        path = content_path(sha256)
+        deduplicated = await run_in_threadpool(_publish, tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    filename, mime = found
+    return ReceivedUpload(path=path, sha256=sha256, size=size, deduplicated=deduplicated,
+                          filename=filename, content_type=mime)
@@ -0,0 +1,231 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from app.utils import querystats
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (non-cumulative, last is +Inf), sum]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(counts), total)) for k, (counts, total) in self._values.items())
+        lines = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus callbacks that turn existing stats() dicts into gauges at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Tuple[str, str, Callable[[], dict]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kw) -> Counter:
+        return self.register(Counter(*args, **kw))
+
+    def gauge(self, *args, **kw) -> Gauge:
+        return self.register(Gauge(*args, **kw))
+
+    def histogram(self, *args, **kw) -> Histogram:
+        return self.register(Histogram(*args, **kw))
+
+    def add_collector(self, prefix: str, documentation: str, stats: Callable[[], dict]):
+        """Expose every numeric value of `stats()` as a gauge named `<prefix>_<key>`."""
+        self._collectors.append((prefix, documentation, stats))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        for prefix, documentation, stats in self._collectors:
+            for key, value in _flatten(stats()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _flatten(stats: dict, prefix: str = ""):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}_")
+        else:
+            yield f"{prefix}{key}", value
+
+
+registry = Registry()
+
+REQUESTS = registry.counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+LATENCY = registry.histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route", "status"))
+IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+REQUEST_SIZE = registry.histogram("http_request_size_bytes", "HTTP request body size.", ("method", "route"),
+                                  buckets=SIZE_BUCKETS)
+RESPONSE_SIZE = registry.histogram("http_response_size_bytes", "HTTP response body size.", ("method", "route"),
+                                   buckets=SIZE_BUCKETS)
+DB_QUERIES = registry.histogram("http_request_db_queries", "SQL statements executed per HTTP request.",
+                                ("method", "route"), buckets=QUERY_BUCKETS)
+DB_TIME = registry.histogram("http_request_db_seconds", "Time spent in SQL statements per HTTP request.",
+                             ("method", "route"))
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; labels by route template, not raw path, to keep cardinality bounded."""
+
+    def __init__(self, app, skip_paths: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+        self._route_paths: Dict[Callable, str] = {}
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            for route in getattr(scope.get("app"), "routes", ()):
+                if getattr(route, "endpoint", None) is not None:
+                    self._route_paths.setdefault(route.endpoint, route.path)
+            path = self._route_paths.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc(method)
+        stats, token = querystats.begin()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            querystats.end(token)
+            IN_FLIGHT.dec(method)
+            route = self._route_label(scope)
+            REQUESTS.inc(method, route, str(status))
+            LATENCY.observe(method, route, str(status), value=elapsed)
+            REQUEST_SIZE.observe(method, route, value=request_bytes)
+            RESPONSE_SIZE.observe(method, route, value=response_bytes)
+            DB_QUERIES.observe(method, route, value=stats.count)
+            DB_TIME.observe(method, route, value=stats.total_seconds)
+            querystats.log_request(method, route, stats)
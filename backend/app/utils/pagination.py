@@ -0,0 +1,87 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: Any, row_id: int) -> str:
+    if isinstance(key, datetime.datetime):
+        key = {"dt": key.isoformat()}
+    raw = json.dumps([sort, key, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, row_id = json.loads(raw)
+        if isinstance(key, dict):
+            key = datetime.datetime.fromisoformat(key["dt"])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_sort != sort or not isinstance(row_id, int):
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    return key, row_id
+
+
+def _nullable(col) -> bool:
+    return getattr(getattr(col, "expression", col), "nullable", True)
+
+
+def keyset_segments(key_col, id_col, after: Optional[Tuple[Any, int]], descending: bool) -> List[Tuple[tuple, tuple]]:
+    """(WHERE clauses, ORDER BY) pairs that, run in turn, walk the rows after ``after``.
+
+    Every segment is a single index seek, so a deep page costs the same as
+    the first. "After (key, id)" is split into the rest of the cursor's key
+    (``key = ? AND id > ?``) followed by the larger keys (``key > ?``)
+    instead of one OR: SQLite seeks a row-value ``(key, id) > (?, ?)`` on
+    the key alone and then scans the tie, which on a low-cardinality key
+    like priority is most of the table. NULL keys sort as larger than any
+    value (last ascending, first descending, PostgreSQL's native order) and
+    are a segment of their own. Callers stop once the page is full.
+    """
+    id_order = id_col.desc() if descending else id_col.asc()
+
+    def past(col, value):
+        return col < value if descending else col > value
+
+    if key_col is id_col:
+        return [(() if after is None else (past(id_col, after[1]),), (id_order,))]
+    order = (key_col.desc() if descending else key_col.asc(), id_order)
+    nullable = _nullable(key_col)
+    if after is None:
+        values = [((key_col.is_not(None),) if nullable else (), order)]
+    elif after[0] is None:
+        # the cursor is inside the NULL segment; values follow it only when descending
+        nulls = ((key_col.is_(None), past(id_col, after[1])), (id_order,))
+        return [nulls, ((key_col.is_not(None),), order)] if descending else [nulls]
+    else:
+        key, row_id = after
+        values = [((key_col == key, past(id_col, row_id)), (id_order,)), ((past(key_col, key),), order)]
+    if not nullable:
+        return values
+    all_nulls = ((key_col.is_(None),), (id_order,))
+    if descending:
+        # NULLs come first, so a cursor on a value is already past them
+        return values if after is not None else [all_nulls] + values
+    return values + [all_nulls]
+
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """'-updated_at' -> ('updated_at', True)."""
+    if sort.startswith("-"):
+        return sort[1:], True
+    return sort, False
+
+
+def split_page(rows, sort: str, key_attr: str, limit: int) -> Tuple[list, Optional[str]]:
+    """Trim a `limit + 1` fetch to one page and build the cursor for the next one."""
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(sort, getattr(last, key_attr), last.id)
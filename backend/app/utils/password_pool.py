@@ -0,0 +1,121 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from anyio.to_thread import run_sync
+
+from app.config import settings
+from app.utils import security
+
+
+class PasswordPoolBusy(Exception):
+    """Raised instead of queueing when the pool is at its queue-depth limit."""
+
+
+class PasswordPool:
+    """Runs bcrypt hash/verify in a bounded process pool.
+
+    bcrypt is CPU-bound, so running it inline in request threads saturates
+    the threadpool during login storms. Callers await the result without
+    holding a worker thread, and at most max_queue calls may be in flight;
+    beyond that the call fails fast with PasswordPoolBusy. A slot is freed
+    only when the worker has really finished, so calls that time out still
+    count until their bcrypt run ends. workers=0 runs the functions in the
+    threadpool, still subject to the queue limit.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def _acquire(self) -> float:
+        with self._lock:
+            if self.in_flight >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy("Password hashing is overloaded, try again shortly")
+            self.in_flight += 1
+        return time.perf_counter()
+
+    def _release(self, start: float):
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    async def run(self, fn, *args):
+        start = self._acquire()
+        if self.workers <= 0:
+            try:
+                return await run_sync(fn, *args)
+            finally:
+                self._release(start)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(start)
+            raise
+        future.add_done_callback(lambda _: self._release(start))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordPoolBusy("Password hashing timed out")
+
+    async def hash(self, password: str) -> str:
+        return await self.run(security.hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self.run(security.verify_password, plain, hashed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "in_flight": self.in_flight,
+                "max_queue": self.max_queue,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": 1000 * self.total_seconds / self.completed if self.completed else 0.0,
+                "max_ms": 1000 * self.max_seconds,
+            }
+
+    def warm(self):
+        """Start the worker processes without waiting for them (they import bcrypt on spawn)."""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(os.getpid)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_POOL_WORKERS if settings.PASSWORD_POOL_WORKERS is not None else min(4, os.cpu_count() or 1),
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    timeout=settings.PASSWORD_POOL_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,185 @@
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextvars import Context, ContextVar
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import anyio
+from jose import JWTError, jwt
+
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SUFFIX = ".folded"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# id of the request being profiled; threadpool calls inherit it with the context
+_profile_id: ContextVar[Optional[str]] = ContextVar("profile_id", default=None)
+
+
+def create_profile_token(issued_by: str) -> str:
+    """Signed value for the X-Profile header. It carries no "sub", so it is useless as an access token."""
+    expire = datetime.utcnow() + timedelta(minutes=settings.PROFILE_TOKEN_EXPIRE_MINUTES)
+    claims = {"scope": "profile", "issued_by": issued_by, "exp": expire}
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return False
+    return claims.get("scope") == "profile"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks of the threads working on one request into collapsed-stack counts.
+
+    The request's work is split between the event loop thread and
+    threadpool workers. The loop thread is counted only while it runs the
+    request's own coroutine chain (below ``root``), and a worker only while
+    it runs a call made from the request's context, which anyio's worker
+    thread holds in the ``context`` local of its run(). Concurrent requests
+    and background jobs are left out.
+    """
+
+    def __init__(self, interval: float, profile_id: str, root):
+        self.interval = interval
+        self.profile_id = profile_id
+        self.root = root
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.root = None
+        return self.samples
+
+    def _works_for_request(self, frame) -> bool:
+        if frame is self.root:
+            return True
+        if frame.f_code.co_name != "run" or not isinstance(frame.f_locals.get("self"), threading.Thread):
+            return False
+        context = frame.f_locals.get("context")
+        return isinstance(context, Context) and context.get(_profile_id) == self.profile_id
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            relevant = False
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                relevant = relevant or self._works_for_request(frame)
+                frame = frame.f_back
+            if relevant:
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                break
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    for name in os.listdir(settings.PROFILE_DIR) if os.path.isdir(settings.PROFILE_DIR) else ():
+        if name.endswith(f"-{profile_id}{PROFILE_SUFFIX}"):
+            return os.path.join(settings.PROFILE_DIR, name)
+    return None
+
+
+def list_profiles() -> List[dict]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stamp, method, route, profile_id = name[:-len(PROFILE_SUFFIX)].split("-", 3)
+        profiles.append({
+            "id": profile_id,
+            "created_at": datetime.strptime(stamp, "%Y%m%dT%H%M%S%f"),
+            "method": method,
+            "path": route,
+            "size": os.path.getsize(os.path.join(settings.PROFILE_DIR, name)),
+        })
+    return profiles
+
+
+def write_profile(profile_id: str, method: str, path: str, samples: Counter):
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    route = re.sub(r"[^A-Za-z0-9_.]+", "_", path).strip("_")[:80] or "root"
+    name = f"{stamp}-{method}-{route}-{profile_id}{PROFILE_SUFFIX}"
+    tmp = os.path.join(settings.PROFILE_DIR, f".{profile_id}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(tmp, os.path.join(settings.PROFILE_DIR, name))
+    # keep only the newest PROFILE_MAX_FILES
+    names = sorted(n for n in os.listdir(settings.PROFILE_DIR) if n.endswith(PROFILE_SUFFIX))
+    for old in names[:max(len(names) - settings.PROFILE_MAX_FILES, 0)]:
+        os.remove(os.path.join(settings.PROFILE_DIR, old))
+
+
+class ProfilingMiddleware:
+    """Profiles a request when it carries a valid X-Profile token or wins the sampling draw.
+
+    Unprofiled requests pay for one header scan, plus one random() when
+    PROFILE_SAMPLE_RATE is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return verify_profile_token(value.decode("latin-1"))
+        rate = settings.PROFILE_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def tagging_send(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        token = _profile_id.set(profile_id)
+        sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000, profile_id, sys._getframe())
+        sampler.start()
+        try:
+            await self.app(scope, receive, tagging_send)
+        finally:
+            samples = sampler.stop()
+            _profile_id.reset(token)
+            await anyio.to_thread.run_sync(write_profile, profile_id, scope["method"], scope["path"], samples)
@@ -0,0 +1,53 @@
+import datetime
+import json
+from typing import List, Optional
+
+from fastapi import HTTPException
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def parse_fields(fields: Optional[str], schema) -> List[str]:
+    """Validate a ?fields=a,b,c sparse fieldset against an output schema.
+
+    Returns the schema's own field order when no subset is requested.
+    """
+    allowed = list(schema.model_fields)
+    if not fields:
+        return allowed
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(422, f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def select_columns(model, fields: List[str], *extra: str):
+    """Columns for the requested fields first, then any extra ones needed internally."""
+    names = list(dict.fromkeys([*fields, *extra]))
+    return [getattr(model, name) for name in names]
+
+
+def rows_response(rows, fields: List[str], headers: Optional[dict] = None) -> Response:
+    """Serialise column tuples straight to JSON, skipping ORM hydration and Pydantic.
+
+    Each row must start with the columns for `fields`, in that order.
+    """
+    body = dumps([dict(zip(fields, row)) for row in rows])
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,112 @@
+import heapq
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+STATEMENT_LOG_CHARS = 1000
+
+
+class QueryStats:
+    """SQL statements issued within one unit of work (usually an HTTP request)."""
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        # min-heap of (seconds, statement), so the fastest of the kept ones is evicted first
+        self._slowest: List[Tuple[float, str]] = []
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if self.statements is not None:
+            self.statements.append(statement)
+        if len(self._slowest) < settings.SQL_SLOWEST_KEPT:
+            heapq.heappush(self._slowest, (seconds, statement))
+        elif self._slowest and seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, statement))
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return sorted(self._slowest, reverse=True)
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("querystats", default=None)
+# process-wide captures used by tests; they see statements from every thread
+_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def begin():
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries():
+    """Collect every statement run on an instrumented engine while the block is active.
+
+    with capture_queries() as stats:
+        client.get("/defects/")
+    assert stats.count <= 3, stats.statements
+    """
+    stats = QueryStats(keep_statements=True)
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._querystats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._querystats_start
+    # threadpool calls copy the context, so sync endpoints land on the same object
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, elapsed)
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, statement[:STATEMENT_LOG_CHARS])
+
+
+def log_request(method: str, route: str, stats: QueryStats):
+    if settings.SQL_REQUEST_QUERY_WARN and stats.count > settings.SQL_REQUEST_QUERY_WARN:
+        logger.warning(
+            "%s %s issued %d statements in %.1f ms; slowest: %s",
+            method, route, stats.count, stats.total_seconds * 1000,
+            "; ".join(f"{seconds * 1000:.1f} ms {statement[:200]}" for seconds, statement in stats.slowest),
+        )
+
+
+def instrument(db_engine):
+    db_engine = getattr(db_engine, "sync_engine", db_engine)
+    if not event.contains(db_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+    return db_engine
@@ -20,9 +20,12 @@ def create_access_token(subject: str, expires_delta: int = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def decode_access_token(token: str):
+def decode_access_token_claims(token: str):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+
+def decode_access_token(token: str):
+    payload = decode_access_token_claims(token)
+    return payload.get("sub") if payload else None
@@ -0,0 +1,228 @@
+"""Latency/throughput benchmarks for the core endpoints against a seeded database.
+
+Runs the app in-process through httpx's ASGI transport, so the numbers
+cover routing, auth, serialisation and SQL but not the network or uvicorn.
+
+    cd backend
+    python -m benchmarks.bench_api --rows 100000 --out bench_100k.json
+    python -m benchmarks.bench_api --rows 100000 --baseline benchmarks/baseline_100k.json
+
+The seeded database is kept (bench_<rows>.db) and reused while its defect
+count matches --rows. An empty database is seeded; one holding other data
+is only dropped and seeded again with --reseed, otherwise the run stops
+with exit status 2. Exit status is 1 when a scenario's p95 regresses past
+--tolerance against the baseline.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+SCENARIOS = ("auth_token", "list_defects_filtered", "search", "update_defect", "csv_export_project")
+# bcrypt and full exports are orders of magnitude slower than the rest
+REQUEST_SHARE = {"auth_token": 0.1, "csv_export_project": 0.05}
+BENCH_PASSWORD = "benchpass"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scale_for(rows: int) -> dict:
+    return {"defects": rows, "projects": max(rows // 1000, 10), "users": max(rows // 200, 20)}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="defects to seed (e.g. 10000, 100000, 1000000)")
+    parser.add_argument("--database-url", help="defaults to sqlite:///./bench_<rows>.db")
+    parser.add_argument("--reseed", action="store_true", help="drop ALL data in the database and seed it again")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="run only these (repeatable)")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown vs baseline (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize(durations, errors: int, wall: float) -> dict:
+    values = sorted(durations)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / wall, 1) if wall else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+    }
+
+
+async def login(client, username, password):
+    r = await client.post("/auth/token", data={"username": username, "password": password})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def build_scenarios(ctx):
+    from app.services.seed_service import WORDS
+
+    statuses = ("new", "in_progress", "review", "closed", "canceled")
+
+    def auth_token(client, rnd):
+        username = rnd.choice(ctx["usernames"])
+        return client.post("/auth/token", data={"username": username, "password": BENCH_PASSWORD})
+
+    def list_defects_filtered(client, rnd):
+        params = {"project_id": rnd.choice(ctx["project_ids"]), "status": rnd.choice(statuses),
+                  "limit": 50, "sort": "-updated_at"}
+        return client.get("/defects/", params=params, headers=ctx["manager"])
+
+    def search(client, rnd):
+        return client.get("/defects/search", params={"q": rnd.choice(WORDS), "limit": 20}, headers=ctx["manager"])
+
+    def update_defect(client, rnd):
+        payload = {"status": rnd.choice(statuses), "priority": rnd.randint(1, 5)}
+        return client.put(f"/defects/{rnd.randint(1, ctx['rows'])}", json=payload, headers=ctx["engineer"])
+
+    def csv_export_project(client, rnd):
+        return client.get("/reports/defects/csv", params={"project_id": rnd.choice(ctx["project_ids"])},
+                          headers=ctx["manager"])
+
+    return {name: fn for name, fn in locals().items() if name in SCENARIOS}
+
+
+async def run_scenario(client, call, requests: int, concurrency: int, seed_value: int) -> dict:
+    rnd = random.Random(seed_value)
+    durations = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            start = time.perf_counter()
+            r = await call(client, rnd)
+            durations.append(time.perf_counter() - start)
+            if r.status_code >= 400:
+                errors += 1
+
+    # warm caches and the pool first, unmeasured
+    for _ in range(min(20, requests)):
+        await call(client, rnd)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(durations, errors, time.perf_counter() - start)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base.get("p95_ms"):
+            continue
+        ratio = current["p95_ms"] / base["p95_ms"]
+        flag = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"{name:24} p95 {base['p95_ms']:>9.2f} -> {current['p95_ms']:>9.2f} ms  x{ratio:.2f}  {flag}")
+        if flag != "ok":
+            regressions.append(name)
+    return regressions
+
+
+async def bench(args, app, ctx) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        ctx["manager"] = await login(client, "manager", "admin123")
+        ctx["engineer"] = await login(client, "engineer", "user123")
+        scenarios = build_scenarios(ctx)
+        results = {}
+        for i, name in enumerate(args.scenario or SCENARIOS):
+            requests = max(int(args.requests * REQUEST_SHARE.get(name, 1)), 10)
+            results[name] = await run_scenario(client, scenarios[name], requests, args.concurrency, seed_value=i)
+            print(f"{name:24} {json.dumps(results[name])}")
+    return results
+
+
+def alembic(*command):
+    # DATABASE_URL is already in the environment the child inherits
+    subprocess.run([sys.executable, "-m", "alembic", "-c", "alembic/alembic.ini", *command],
+                   cwd=BACKEND_DIR, check=True, capture_output=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # settings are read at import time, so point the app at the bench DB first
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///./bench_{args.rows}.db"
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+    # the app never creates its schema; a new bench DB needs the migrations first
+    alembic("upgrade", "head")
+
+    from sqlalchemy import func, select
+    from app.database import engine
+    from app.main import app
+    from app.models import Defect, Project, User
+    from app.services.seed_service import seed_database
+
+    with engine.connect() as conn:
+        seeded = conn.execute(select(func.count()).select_from(Defect)).scalar_one()
+        has_users = conn.execute(select(func.count()).select_from(User)).scalar_one() > 0
+    if seeded != args.rows and (seeded or has_users) and not args.reseed:
+        # never wipe a database just because its size differs: it may be a real one
+        print(f"{engine.url.render_as_string(hide_password=True)} already holds {seeded} defects, not {args.rows}; "
+              "pass --reseed to drop all of its data and seed it again", file=sys.stderr)
+        return 2
+    if args.reseed:
+        engine.dispose()
+        alembic("downgrade", "base")
+        alembic("upgrade", "head")
+    if args.reseed or seeded != args.rows:
+        start = time.perf_counter()
+        scale = scale_for(args.rows)
+        seed_database(engine, users=scale["users"], projects=scale["projects"], defects=args.rows,
+                      password=BENCH_PASSWORD)
+        print(f"seeded {args.rows} defects in {time.perf_counter() - start:.1f}s")
+    with engine.connect() as conn:
+        project_ids = conn.execute(select(Project.id)).scalars().all()
+        usernames = conn.execute(select(User.username).where(User.username.like("user%"))).scalars().all()
+    ctx = {"rows": args.rows, "project_ids": project_ids, "usernames": usernames}
+
+    results = {
+        "meta": {
+            "rows": args.rows,
+            "database": engine.dialect.name,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        },
+        "scenarios": asyncio.run(bench(args, app, ctx)),
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"p95 regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Cold-start benchmark: fresh interpreter to first served request.
+
+Each run starts a new Python process that imports app.main, runs the
+lifespan (pool warm-up, schema preload) and serves a first request
+without and with a database query. The parent migrates a scratch SQLite
+database once and records per-phase timings.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 10 --out startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+t1 = time.perf_counter()
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    assert client.get("/health/live").status_code == 200
+    t3 = time.perf_counter()
+    # unknown user: one SELECT, no bcrypt
+    assert client.post("/auth/token", data={"username": "nobody", "password": "x"}).status_code == 401
+    t4 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "lifespan_ms": (t2 - t1) * 1000,
+                  "first_request_ms": (t3 - t2) * 1000, "first_db_request_ms": (t4 - t3) * 1000}))
+"""
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", help="already migrated database; defaults to a scratch SQLite file")
+    parser.add_argument("--out", help="write results JSON here")
+    return parser.parse_args(argv)
+
+
+def run_child(env) -> dict:
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    timings = json.loads(out.strip().splitlines()[-1])
+    # includes interpreter start-up and teardown
+    timings["process_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, UPLOAD_DIR=os.path.join(tmp, "uploads"), PASSWORD_POOL_WORKERS="0")
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'startup.db')}"
+        if not args.database_url:
+            subprocess.run([sys.executable, "-m", "alembic", "-c", "alembic/alembic.ini", "upgrade", "head"],
+                           cwd=BACKEND_DIR, env=env, check=True, capture_output=True)
+        runs = [run_child(env) for _ in range(args.runs)]
+
+    results = {}
+    for phase in runs[0]:
+        values = sorted(run[phase] for run in runs)
+        results[phase] = {"median": round(statistics.median(values), 1), "min": round(values[0], 1),
+                          "max": round(values[-1], 1)}
+        print(f"{phase:22} median {results[phase]['median']:>8.1f} ms  (min {results[phase]['min']:.1f}, "
+              f"max {results[phase]['max']:.1f})")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "phases": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Наполнение базы: демо-аккаунты из README и, по желанию, синтетические
+пользователи, проекты и дефекты в больших объёмах.
+
+    python seed.py                                   # только демо-аккаунты
+    python seed.py --users 2000 --projects 500 --defects 2000000
+    python seed.py --database-url postgresql://defects_user:defects_pass@db:5432/defects_db --defects 5000000
+
+Вставка пачками (executemany, на PostgreSQL — COPY); пароль хешируется
+один раз на каждое уникальное значение.
+"""
+import argparse
+import os
+import sys
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="по умолчанию DATABASE_URL из настроек")
+    parser.add_argument("--users", type=int, default=0, help="сколько сгенерировать пользователей")
+    parser.add_argument("--projects", type=int, default=0)
+    parser.add_argument("--defects", type=int, default=0)
+    parser.add_argument("--password", default="userpass", help="общий пароль сгенерированных пользователей")
+    parser.add_argument("--no-demo", action="store_true", help="не создавать admin/manager/engineer/observer")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42, help="seed генератора, для воспроизводимости")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.database_url:
+        # settings are read at import time
+        os.environ["DATABASE_URL"] = args.database_url
+    # every bulk batch would trip the slow-query log
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+    from app.database import engine
+    from app.services.seed_service import seed_database
+
+    # the schema itself comes from: alembic -c alembic/alembic.ini upgrade head
+    start = time.perf_counter()
+
+    def progress(done):
+        rate = done / (time.perf_counter() - start)
+        print(f"\r  дефектов: {done}/{args.defects} ({rate:,.0f}/с)", end="", flush=True)
+
+    created = seed_database(engine, users=args.users, projects=args.projects, defects=args.defects,
+                            password=args.password, demo=not args.no_demo, seed=args.seed,
+                            batch_size=args.batch_size, progress=progress)
+    if args.defects:
+        print()
+    print(f"Создано за {time.perf_counter() - start:.1f} с: " + ", ".join(f"{k}={v}" for k, v in created.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from app.main import app
 from app.database import Base, engine, SessionLocal
 from app import models
 from app.utils.security import hash_password
+from app.deps import token_cache, user_cache
+from app.services.report_cache import report_cache
+from app.utils.querystats import capture_queries
 
 # Use a test sqlite DB file
 TEST_DB = "sqlite:///./test.db"
@@ -22,8 +26,12 @@ def test_client():
 def seed_db():
     db = SessionLocal()
     # clean tables
+    db.query(models.Attachment).delete()
     db.query(models.Defect).delete()
     db.query(models.Project).delete()
+    # after the defects: deleting them logs tombstone events
+    db.query(models.DefectEvent).delete()
+    db.query(models.ReportJob).delete()
     db.query(models.User).delete()
     db.commit()
     # create manager and engineer and observer
@@ -33,4 +41,18 @@ def seed_db():
     db.add_all([manager, engineer, observer])
     db.commit()
     db.close()
+    # users were recreated behind the API's back
+    token_cache.clear()
+    user_cache.clear()
+    report_cache.clear()
     yield
+
+@pytest.fixture
+def max_queries():
+    """`with max_queries(3): client.get(...)` fails if the block runs more than 3 SQL statements."""
+    @contextmanager
+    def check(limit):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"{stats.count} statements, expected at most {limit}:\n" + "\n".join(stats.statements)
+    return check
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app import deps, models
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.main import app
+from app.utils.security import hash_password
+
+
+def admin_headers(client):
+    db = SessionLocal()
+    db.add(models.User(username="admin", hashed_password=hash_password("adminpass"), role=models.RoleEnum.admin))
+    db.commit()
+    db.close()
+    token = client.post("/auth/token", data={"username": "admin", "password": "adminpass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_pool_status_is_admin_only(test_client):
+    headers = admin_headers(test_client)
+    r = test_client.get("/admin/pool", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["size"] == settings.DB_POOL_SIZE
+    assert r.json()["checkouts"] >= 1
+
+    token = test_client.post("/auth/token", data={"username": "manager", "password": "managerpass"}).json()["access_token"]
+    assert test_client.get("/admin/pool", headers={"Authorization": f"Bearer {token}"}).status_code == 403
+
+
+def test_readiness_reports_pool_saturation(test_client, monkeypatch):
+    r = test_client.get("/health/ready")
+    assert r.status_code == 200
+    assert r.json()["status"] == "ok"
+
+    monkeypatch.setattr(settings, "DB_POOL_READY_MAX_UTILIZATION", 0.0)
+    r = test_client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["status"] == "saturated"
+
+
+def test_profile_request_with_signed_header(test_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    headers = admin_headers(test_client)
+    assert "x-profile-id" not in test_client.get("/projects/", headers=headers).headers
+    assert "x-profile-id" not in test_client.get("/projects/", headers={**headers, "X-Profile": "forged"}).headers
+
+    token = test_client.post("/admin/profiles/token", headers=headers).json()["token"]
+    r = test_client.get("/projects/", headers={**headers, "X-Profile": token})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+
+    listed = test_client.get("/admin/profiles", headers=headers).json()
+    assert [(p["id"], p["method"]) for p in listed] == [(profile_id, "GET")]
+    body = test_client.get(f"/admin/profiles/{profile_id}", headers=headers).text
+    stack, count = body.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) >= 1
+    assert test_client.get("/admin/profiles/" + "0" * 32, headers=headers).status_code == 404
+
+    # the profile token is not an access token
+    assert test_client.get("/projects/", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_profile_leaves_out_other_threads(test_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 0.5)
+    headers = admin_headers(test_client)
+    token = test_client.post("/admin/profiles/token", headers=headers).json()["token"]
+
+    # get_current_user runs in the threadpool; make it slow enough to be sampled
+    cached_username = deps.token_cache.get
+
+    def slow_token_lookup(key):
+        time.sleep(0.05)
+        return cached_username(key)
+
+    monkeypatch.setattr(deps.token_cache, "get", slow_token_lookup)
+    done = threading.Event()
+
+    def unrelated_background_work():
+        while not done.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=unrelated_background_work)
+    worker.start()
+    try:
+        r = test_client.get("/projects/", headers={**headers, "X-Profile": token})
+    finally:
+        done.set()
+        worker.join()
+
+    body = test_client.get(f"/admin/profiles/{r.headers['x-profile-id']}", headers=headers).text
+    assert body
+    assert "unrelated_background_work" not in body
+    assert "slow_token_lookup" in body
+
+
+def test_profile_sampling_rate(test_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    assert "x-profile-id" in test_client.get("/health/live").headers
+
+
+def test_lifespan_warms_pool_and_creates_upload_dir(tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "DB_POOL_WARM_CONNECTIONS", 3)
+    with TestClient(app) as client:
+        assert upload_dir.is_dir()
+        assert engine.pool.checkedin() >= 3
+        assert client.get("/health/live").status_code == 200
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import text
+from app.main import app
+from app.database import async_database_url, create_async_session_factory, engine
+from app.deps import get_async_db
+
+
+@pytest.fixture
+def aiosqlite_db():
+    factory = create_async_session_factory(async_database_url(str(engine.url)))
+
+    async def override():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./dev.db") == "sqlite+aiosqlite:///./dev.db"
+    assert async_database_url("postgresql+psycopg2://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+
+
+def test_routers_on_aiosqlite(test_client, aiosqlite_db):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Async"}, headers=headers).json()["id"]
+    assert [p["name"] for p in test_client.get("/projects/", headers=headers).json()] == ["Async"]
+
+    d = test_client.post("/defects/", json={"title":"Crack", "project_id":pid}, headers=headers).json()
+    r = test_client.put(f"/defects/{d['id']}", json={"status":"review"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["status"] == "review"
+
+    # the importer runs in the threadpool on its own sync session, never on the event loop
+    r = test_client.post("/defects/import", files={"file": ("x.ndjson", f'{{"title": "Leak", "project_id": {pid}}}\n')}, headers=headers)
+    assert r.json()["inserted"] == 1
+
+    r = test_client.get("/defects/", params={"project_id": pid, "limit": 10}, headers=headers)
+    assert [x["title"] for x in r.json()] == ["Crack", "Leak"]
+    assert test_client.get("/reports/defects/stats", headers=headers).json()["by_status"] == {"new": 1, "review": 1}
+
+def test_aiosqlite_connections_get_pragmas(tmp_path):
+    import asyncio
+    from app.config import settings
+
+    factory = create_async_session_factory(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+
+    async def pragmas():
+        async with factory() as db:
+            journal = (await db.execute(text("PRAGMA journal_mode"))).scalar()
+            timeout = (await db.execute(text("PRAGMA busy_timeout"))).scalar()
+        await factory.kw["bind"].dispose()
+        return journal, timeout
+
+    assert asyncio.run(pragmas()) == ("wal", settings.SQLITE_BUSY_TIMEOUT_MS)
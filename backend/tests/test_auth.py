@@ -13,3 +13,31 @@ def test_token_and_register(test_client):
     resp = test_client.post("/auth/token", data={"username":"u1","password":"secret1"})
     assert resp.status_code == 200
     assert "access_token" in resp.json()
+
+def test_password_pool_fails_fast_when_full(test_client):
+    from app.utils.password_pool import password_pool
+    max_queue = password_pool.max_queue
+    password_pool.max_queue = 0
+    try:
+        resp = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"})
+    finally:
+        password_pool.max_queue = max_queue
+    assert resp.status_code == 503
+    assert password_pool.stats()["rejected"] >= 1
+
+def test_password_pool_keeps_slot_until_timed_out_work_finishes():
+    import asyncio
+    import time
+    import pytest
+    from app.utils.password_pool import PasswordPool, PasswordPoolBusy
+
+    pool = PasswordPool(workers=1, max_queue=1, timeout=0.05)
+    try:
+        with pytest.raises(PasswordPoolBusy, match="timed out"):
+            asyncio.run(pool.run(time.sleep, 2.0))
+        # the caller gave up but the worker is still busy, so the slot stays taken
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(PasswordPoolBusy, match="overloaded"):
+            asyncio.run(pool.run(time.sleep, 0))
+    finally:
+        pool.shutdown()
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_bench(*args):
+    # a fresh interpreter: the benchmark points the app's settings at its own database
+    return subprocess.run([sys.executable, "-m", "benchmarks.bench_api", *args], cwd=BACKEND_DIR,
+                          env=dict(os.environ, PASSWORD_POOL_WORKERS="0"), capture_output=True, text=True)
+
+
+def test_bench_api_runs_against_a_fresh_database(tmp_path):
+    out = tmp_path / "bench.json"
+    result = run_bench("--rows", "300", "--database-url", f"sqlite:///{tmp_path / 'bench.db'}",
+                       "--requests", "10", "--concurrency", "2",
+                       "--scenario", "list_defects_filtered", "--scenario", "search", "--out", str(out))
+    assert result.returncode == 0, result.stderr
+    scenarios = json.loads(out.read_text())["scenarios"]
+    assert set(scenarios) == {"list_defects_filtered", "search"}
+    assert all(s["errors"] == 0 and s["requests"] == 10 for s in scenarios.values())
+
+
+def test_bench_api_refuses_to_wipe_a_database_without_reseed(tmp_path):
+    from sqlalchemy import create_engine, text
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    args = ("--database-url", url, "--requests", "10", "--concurrency", "1", "--scenario", "search")
+    assert run_bench("--rows", "200", *args).returncode == 0
+
+    refused = run_bench("--rows", "300", *args)
+    assert refused.returncode == 2
+    assert "--reseed" in refused.stderr
+    db_engine = create_engine(url)
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM defects")).scalar() == 200
+
+    assert run_bench("--rows", "300", "--reseed", *args).returncode == 0
+    with db_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM defects")).scalar() == 300
+    db_engine.dispose()
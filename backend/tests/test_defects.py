@@ -1,3 +1,7 @@
+from app import models
+from app.database import SessionLocal
+
+
 def test_defect_crud(test_client):
     # create project as manager
     token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
@@ -19,3 +23,300 @@ def test_defect_crud(test_client):
     resp3 = test_client.put(f"/defects/{d['id']}", json={"status":"in_progress"}, headers=headers2)
     assert resp3.status_code == 200
     assert resp3.json()["status"] == "in_progress"
+
+def test_defect_keyset_pagination(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Paged", "description":"Pagination"}, headers=headers).json()["id"]
+    for i in range(5):
+        test_client.post("/defects/", json={"title":f"D{i}", "priority": i % 2 + 1, "project_id": pid}, headers=headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"project_id": pid, "limit": 2, "sort": "priority"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = test_client.get("/defects/", params=params, headers=headers)
+        assert resp.status_code == 200
+        seen.extend(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert [d["title"] for d in seen] == ["D0", "D2", "D4", "D1", "D3"]
+
+    # a cursor issued for one sort order is rejected for another
+    first = test_client.get("/defects/", params={"limit": 2, "sort": "priority"}, headers=headers)
+    resp = test_client.get("/defects/", params={"limit": 2, "sort": "-updated_at", "cursor": first.headers["X-Next-Cursor"]}, headers=headers)
+    assert resp.status_code == 400
+
+def test_keyset_pagination_through_null_priority(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Nulls"}, headers=headers).json()["id"]
+    ids = [test_client.post("/defects/", json={"title":f"N{i}", "priority": i + 1, "project_id": pid}, headers=headers).json()["id"]
+           for i in range(4)]
+    for defect_id in ids[1:3]:
+        assert test_client.put(f"/defects/{defect_id}", json={"priority": None}, headers=headers).status_code == 200
+
+    def walk(sort, limit=1):
+        seen, cursor = [], None
+        while True:
+            params = {"project_id": pid, "limit": limit, "sort": sort, **({"cursor": cursor} if cursor else {})}
+            resp = test_client.get("/defects/", params=params, headers=headers)
+            assert resp.status_code == 200
+            seen.extend(d["title"] for d in resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return seen
+
+    # NULL sorts as the largest priority: last ascending, first descending
+    assert walk("priority") == ["N0", "N3", "N1", "N2"]
+    assert walk("-priority") == ["N2", "N1", "N3", "N0"]
+    # pages that span the value and NULL segments
+    assert walk("priority", 3) == ["N0", "N3", "N1", "N2"]
+    assert walk("-priority", 3) == ["N2", "N1", "N3", "N0"]
+
+def test_keyset_segments_are_index_seeks():
+    import datetime
+    from sqlalchemy import select, text
+    from app.database import engine
+    from app.models import Defect
+    from app.utils.pagination import keyset_segments
+
+    cursors = {"priority": [None, (3, 10), (None, 10)],
+               "updated_at": [None, (datetime.datetime(2024, 1, 1), 10), (None, 10)]}
+    with engine.connect() as conn:
+        for key, afters in cursors.items():
+            for after in afters:
+                for descending in (False, True):
+                    for where, order in keyset_segments(getattr(Defect, key), Defect.id, after, descending):
+                        stmt = select(Defect.id).where(Defect.project_id == 1, *where).order_by(*order).limit(10)
+                        sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+                        assert " OR " not in sql
+                        plan = " ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql)))
+                        assert plan.startswith("SEARCH") and "TEMP B-TREE" not in plan, (key, after, descending, plan)
+
+def test_attachment_upload_dedupe_and_limit(test_client, tmp_path, monkeypatch):
+    from app.config import settings
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_BYTES", 4)
+    token = test_client.post("/auth/token", data={"username":"engineer","password":"engineerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    mtoken = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    pid = test_client.post("/projects/", json={"name":"Files"}, headers={"Authorization": f"Bearer {mtoken}"}).json()["id"]
+    did = test_client.post("/defects/", json={"title":"Photo", "project_id":pid}, headers=headers).json()["id"]
+
+    first = test_client.post(f"/defects/{did}/attachments", files={"file": ("a.jpg", b"same bytes", "image/jpeg")}, headers=headers)
+    second = test_client.post(f"/defects/{did}/attachments", files={"file": ("b.jpg", b"same bytes", "image/jpeg")}, headers=headers)
+    assert first.status_code == 200
+    assert first.json()["sha256"] == second.json()["sha256"]
+    assert first.json()["size"] == 10
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+    listed = test_client.get(f"/defects/{did}/attachments", headers=headers).json()
+    assert [a["filename"] for a in listed] == ["a.jpg", "b.jpg"]
+    assert test_client.get("/defects/999999/attachments", headers=headers).status_code == 404
+    url = f"/defects/{did}/attachments/{first.json()['id']}"
+    full = test_client.get(url, headers=headers)
+    assert full.content == b"same bytes"
+    assert full.headers["content-type"] == "image/jpeg"
+    part = test_client.get(url, headers={**headers, "Range": "bytes=5-"})
+    assert part.status_code == 206
+    assert part.content == b"bytes"
+    cached = test_client.get(url, headers={**headers, "If-None-Match": full.headers["etag"]})
+    assert cached.status_code == 304
+    # content missing from disk: gone, not a server error
+    stored = next(p for p in tmp_path.rglob("*") if p.is_file())
+    data = stored.read_bytes()
+    stored.unlink()
+    assert test_client.get(url, headers=headers).status_code == 410
+    stored.write_bytes(data)
+
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 8)
+    r = test_client.post(f"/defects/{did}/attachments", files={"file": ("c.jpg", b"0123456789", "image/jpeg")}, headers=headers)
+    assert r.status_code == 413
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 1
+
+def test_attachment_upload_rejected_before_body_is_read(test_client, tmp_path, monkeypatch):
+    from app.config import settings
+    from app.utils import file_upload
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+    token = test_client.post("/auth/token", data={"username":"engineer","password":"engineerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    mtoken = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    pid = test_client.post("/projects/", json={"name":"Big files"}, headers={"Authorization": f"Bearer {mtoken}"}).json()["id"]
+    did = test_client.post("/defects/", json={"title":"Scan", "project_id":pid}, headers=headers).json()["id"]
+
+    big = b"x" * (1024 + file_upload.MULTIPART_OVERHEAD_BYTES + 1)
+    r = test_client.post(f"/defects/{did}/attachments", files={"file": ("scan.tif", big, "image/tiff")}, headers=headers)
+    assert r.status_code == 413
+    assert r.json()["detail"].startswith("Request body exceeds")  # refused on Content-Length
+    r = test_client.post(f"/defects/{did}/attachments", data={"note": "no file"}, files={"other": ("x.txt", b"x")}, headers=headers)
+    assert r.status_code == 400
+    assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+
+def test_attachment_upload_holds_no_connection_while_streaming(test_client, tmp_path, monkeypatch):
+    from app.config import settings
+    from app.database import engine
+    from app.deps import user_cache
+    from app.routers import defects
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    token = test_client.post("/auth/token", data={"username":"engineer","password":"engineerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    mtoken = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    pid = test_client.post("/projects/", json={"name":"Slow upload"}, headers={"Authorization": f"Bearer {mtoken}"}).json()["id"]
+    did = test_client.post("/defects/", json={"title":"Scan", "project_id":pid}, headers=headers).json()["id"]
+
+    checked_out = []
+    receive_upload = defects.receive_upload
+
+    async def observed(request):
+        checked_out.append(engine.pool.checkedout())
+        return await receive_upload(request)
+
+    monkeypatch.setattr(defects, "receive_upload", observed)
+    user_cache.clear()  # the user lookup's connection must be released too
+    r = test_client.post(f"/defects/{did}/attachments", files={"file": ("scan.png", b"png", "image/png")}, headers=headers)
+    assert r.status_code == 200
+    assert checked_out == [0]
+
+def test_bulk_import_reports_row_errors(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Imported"}, headers=headers).json()["id"]
+
+    csv_body = (
+        "title,description,priority,project_id,assigned_to\n"
+        f"Crack,Wall,1,{pid},\n"
+        f",Missing title,2,{pid},\n"
+        "Leak,,3,999999,\n"
+        f"Gap,,x,{pid},\n"
+        f"Stain,Ceiling,,{pid},\n"
+    )
+    r = test_client.post("/defects/import", files={"file": ("punch.csv", csv_body, "text/csv")}, headers=headers)
+    assert r.status_code == 200
+    report = r.json()
+    assert report["inserted"] == 2
+    assert [e["row"] for e in report["errors"]] == [3, 4, 5]
+
+    ndjson_body = f'{{"title": "Door", "project_id": {pid}}}\nnot json\n'
+    r = test_client.post("/defects/import", files={"file": ("punch.ndjson", ndjson_body)}, headers=headers)
+    assert r.json()["inserted"] == 1
+    assert r.json()["errors"][0]["row"] == 2
+
+    titles = sorted(d["title"] for d in test_client.get("/defects/", params={"project_id": pid}, headers=headers).json())
+    assert titles == ["Crack", "Door", "Stain"]
+
+def test_bulk_status_transition(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Walk"}, headers=headers).json()["id"]
+    ids = [test_client.post("/defects/", json={"title":f"W{i}", "project_id":pid}, headers=headers).json()["id"] for i in range(4)]
+
+    r = test_client.patch("/defects/bulk", json={"ids": ids[:3], "changes": {"status": "closed"}}, headers=headers)
+    assert r.status_code == 200
+    assert r.json() == {"updated": 3, "ids": ids[:3]}
+
+    r = test_client.patch("/defects/bulk", json={"filter": {"project_id": pid, "status": "new"}, "changes": {"assigned_to": 2}}, headers=headers)
+    assert r.json()["ids"] == ids[3:]
+    defects = {d["id"]: d for d in test_client.get("/defects/", params={"project_id": pid}, headers=headers).json()}
+    assert [defects[i]["status"] for i in ids] == ["closed", "closed", "closed", "new"]
+    assert defects[ids[3]]["assigned_to"] == 2
+
+    assert test_client.patch("/defects/bulk", json={"filter": {}, "changes": {"status": "new"}}, headers=headers).status_code == 422
+    otoken = test_client.post("/auth/token", data={"username":"observer","password":"observerpass"}).json()["access_token"]
+    r = test_client.patch("/defects/bulk", json={"ids": ids, "changes": {"status": "new"}}, headers={"Authorization": f"Bearer {otoken}"})
+    assert r.status_code == 403
+
+def test_full_text_search(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Search"}, headers=headers).json()["id"]
+    ids = {}
+    for title, description in (("Ceiling leak", "Water on floor 3"), ("Wall crack", "Трещина в несущей стене"), ("Pipe", "Leaking joint")):
+        ids[title] = test_client.post("/defects/", json={"title":title, "description":description, "project_id":pid}, headers=headers).json()["id"]
+
+    found = test_client.get("/defects/search", params={"q": "leak"}, headers=headers).json()
+    assert sorted(d["id"] for d in found) == sorted([ids["Ceiling leak"], ids["Pipe"]])
+    assert [d["id"] for d in test_client.get("/defects/search", params={"q": "трещина"}, headers=headers).json()] == [ids["Wall crack"]]
+
+    # index follows updates
+    test_client.put(f"/defects/{ids['Pipe']}", json={"description": "Rusty joint"}, headers=headers)
+    found = test_client.get("/defects/search", params={"q": "leak"}, headers=headers).json()
+    assert [d["id"] for d in found] == [ids["Ceiling leak"]]
+    assert test_client.get("/defects/search", params={"q": "\"*"}, headers=headers).json() == []
+
+def test_delta_sync_changes(test_client):
+    from app.database import SessionLocal
+    from app import models
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Sync"}, headers=headers).json()["id"]
+    a = test_client.post("/defects/", json={"title":"A", "project_id":pid}, headers=headers).json()["id"]
+    b = test_client.post("/defects/", json={"title":"B", "project_id":pid}, headers=headers).json()["id"]
+
+    first = test_client.get("/defects/changes", params={"since": 0}, headers=headers).json()
+    assert sorted(d["id"] for d in first["changes"]) == [a, b]
+    cursor = first["cursor"]
+    assert test_client.get("/defects/changes", params={"since": cursor}, headers=headers).json()["changes"] == []
+
+    test_client.put(f"/defects/{a}", json={"status":"review"}, headers=headers)
+    test_client.patch("/defects/bulk", json={"ids": [a], "changes": {"priority": 1}}, headers=headers)
+    test_client.post("/defects/import", files={"file": ("x.ndjson", f'{{"title": "C", "project_id": {pid}}}\n')}, headers=headers)
+    assert test_client.delete(f"/defects/{b}", headers=headers).status_code == 204
+
+    delta = test_client.get("/defects/changes", params={"since": cursor}, headers=headers).json()
+    assert [d["title"] for d in delta["changes"]] == ["A", "C"]
+    assert delta["changes"][0]["priority"] == 1
+    assert delta["deleted"] == [b]
+    assert delta["cursor"] > cursor
+    cursor = delta["cursor"]
+
+    # a defect moved to another project is a tombstone in its old project's feed
+    other = test_client.post("/projects/", json={"name":"Sync 2"}, headers=headers).json()["id"]
+    db = SessionLocal()
+    db.get(models.Defect, a).project_id = other
+    db.commit()
+    # deleting the project cascades to its defects
+    db.delete(db.get(models.Project, pid))
+    db.commit()
+    db.close()
+    moved = test_client.get("/defects/changes", params={"since": cursor, "project_id": pid}, headers=headers).json()
+    assert moved["changes"] == [] and sorted(moved["deleted"]) == sorted([a, delta["changes"][1]["id"]])
+    assert [d["id"] for d in test_client.get("/defects/changes", params={"since": cursor}, headers=headers).json()["changes"]] == [a]
+
+def test_sparse_fieldsets_match_full_schema(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Grid"}, headers=headers).json()["id"]
+    did = test_client.post("/defects/", json={"title":"Крен", "description":"Tilt", "project_id":pid}, headers=headers).json()["id"]
+
+    # the column fast path serialises exactly like DefectOut
+    listed = test_client.get("/defects/", params={"project_id": pid}, headers=headers).json()
+    assert listed == [test_client.get(f"/defects/{did}", headers=headers).json()]
+
+    r = test_client.get("/defects/", params={"project_id": pid, "fields": "id,title,status", "limit": 1, "sort": "-updated_at"}, headers=headers)
+    assert r.json() == [{"id": did, "title": "Крен", "status": "new"}]
+    assert test_client.get("/defects/", params={"fields": "id,secret"}, headers=headers).status_code == 422
+
+    users = test_client.get("/users/", params={"fields": "username,role"}, headers=headers).json()
+    assert {"username": "manager", "role": "manager"} in users
+
+def test_list_query_count_does_not_grow_with_rows(test_client, max_queries):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"N1"}, headers=headers).json()["id"]
+    test_client.post("/defects/", json={"title":"first", "project_id":pid}, headers=headers)
+
+    # version probe + one SELECT, however many rows come back
+    with max_queries(2):
+        assert len(test_client.get("/defects/", headers=headers).json()) == 1
+    db = SessionLocal()
+    db.add_all([models.Defect(title=f"d{i}", project_id=pid, created_by=1, assigned_to=2) for i in range(30)])
+    db.commit()
+    db.close()
+    with max_queries(2):
+        assert len(test_client.get("/defects/", headers=headers).json()) == 31
+    with max_queries(2):
+        assert len(test_client.get("/defects/", params={"limit": 10, "project_id": pid}, headers=headers).json()) == 10
@@ -0,0 +1,66 @@
+import asyncio
+from app.services.event_broker import EventBroker, broker, sse_stream
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def test_broker_scopes_by_project_and_drops_slow_consumers():
+    async def scenario():
+        b = EventBroker(queue_size=2)
+        site = b.subscribe(project_id=1)
+        everything = b.subscribe()
+        b.publish({"type": "create", "project_id": 1})
+        b.publish({"type": "create", "project_id": 2})
+        assert site.queue.qsize() == 1
+        assert everything.queue.qsize() == 2
+
+        # everything's queue is full: the next event drops it instead of blocking
+        b.publish({"type": "update", "project_id": 1})
+        assert everything.dropped
+        assert not site.dropped
+        assert b.stats() == {"subscribers": 1, "published": 3, "dropped": 1}
+
+    asyncio.run(scenario())
+
+
+def test_defect_writes_reach_sse_subscribers(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Live"}, headers=headers).json()["id"]
+    sub = broker.subscribe(pid)
+
+    did = test_client.post("/defects/", json={"title":"Live", "project_id":pid}, headers=headers).json()["id"]
+    test_client.put(f"/defects/{did}", json={"assigned_to": 2}, headers=headers)
+
+    async def read(n):
+        stream = sse_stream(ConnectedRequest(), sub, heartbeat=0.01)
+        frames = [await stream.__anext__() for _ in range(n)]
+        await stream.aclose()
+        return frames
+
+    frames = asyncio.run(read(3))
+    assert frames[0].startswith("retry:")
+    assert frames[1].startswith("event: create\n")
+    assert frames[2].startswith("event: assign\n")
+    assert f'"defect_id": {did}' in frames[2]
+    # closing the stream unsubscribes
+    assert sub not in broker._subscribers.get(pid, set())
+
+def test_imported_defects_reach_sse_subscribers(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Live import"}, headers=headers).json()["id"]
+    sub = broker.subscribe(pid)
+    body = "".join(f'{{"title": "Row {i}", "project_id": {pid}}}\n' for i in range(3))
+    assert test_client.post("/defects/import", files={"file": ("x.ndjson", body)}, headers=headers).json()["inserted"] == 3
+
+    # one message per committed batch, not one per row
+    assert sub.queue.qsize() == 1
+    event = sub.queue.get_nowait()
+    broker.unsubscribe(sub)
+    assert event["type"] == "import" and event["project_id"] == pid
+    ids = [d["id"] for d in test_client.get("/defects/", params={"project_id": pid}, headers=headers).json()]
+    assert event["defect_ids"] == ids
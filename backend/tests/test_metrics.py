@@ -0,0 +1,58 @@
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.utils.metrics import Histogram, Registry
+
+
+def get_token(client, username, password):
+    r = client.post("/auth/token", data={"username": username, "password": password})
+    return r.json()["access_token"]
+
+
+def test_metrics_exposes_route_latency_and_queries(test_client):
+    token = get_token(test_client, "manager", "managerpass")
+    headers = {"Authorization": f"Bearer {token}"}
+    r = test_client.post("/projects/", json={"name": "P"}, headers=headers)
+    pid = r.json()["id"]
+    r = test_client.post("/defects/", json={"title": "D", "project_id": pid}, headers=headers)
+    assert test_client.get(f"/defects/{r.json()['id']}", headers=headers).status_code == 200
+    test_client.get("/no/such/path")
+
+    r = test_client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = r.text
+    # labelled by route template, not by the concrete id
+    assert 'http_requests_total{method="GET",route="/defects/{defect_id}",status="200"}' in body
+    assert 'route="<unmatched>",status="404"' in body
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/defects/",status="200",le="+Inf"}' in body
+    assert 'http_request_db_queries_count{method="GET",route="/defects/{defect_id}"}' in body
+    assert 'http_requests_in_flight{method="GET"} 0' in body
+    assert "db_pool_checked_out" in body
+    assert "auth_cache_tokens_hits" in body
+    assert "password_pool_completed" in body
+    assert "/metrics" not in body
+
+
+def test_histogram_text_format():
+    registry = Registry()
+    h = registry.register(Histogram("t_seconds", "Test.", ("route",), buckets=(0.1, 1)))
+    h.observe("/a", value=0.05)
+    h.observe("/a", value=0.5)
+    h.observe("/a", value=5)
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP t_seconds Test.", "# TYPE t_seconds histogram"]
+    assert 't_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 't_seconds_sum{route="/a"} 5.55' in lines
+    assert 't_seconds_count{route="/a"} 3' in lines
+
+
+def test_slow_query_log(caplog, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.000001)
+    with caplog.at_level("WARNING", logger="app.sql"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 42"))
+    assert any("slow query" in r.getMessage() and "SELECT 42" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,83 @@
+import os
+import threading
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+# a scratch PostgreSQL database for the dialect-specific DDL; its schema is dropped afterwards
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def alembic_config(url):
+    # no ini file: keeps alembic's fileConfig from resetting the app's loggers
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_fresh_database_upgrades_to_the_models(tmp_path):
+    config = alembic_config(f"sqlite:///{tmp_path / 'fresh.db'}")
+    command.upgrade(config, "head")
+    command.check(config)  # raises if the models and the migrated schema differ
+
+
+def test_pre_migration_database_is_adopted_and_upgraded(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    config = alembic_config(url)
+    # the baseline revision is the schema the old create_all produced; drop the
+    # version table to get a database that never saw alembic
+    command.upgrade(config, "0001")
+    db_engine = create_engine(url)
+    with db_engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+        conn.execute(text("INSERT INTO users (username, hashed_password, role, created_at) "
+                          "VALUES ('old', 'x', 'manager', '2024-01-01 00:00:00')"))
+        conn.execute(text("INSERT INTO projects (name) VALUES ('P')"))
+        conn.execute(text("INSERT INTO defects (title, status, project_id) VALUES ('Old crack', 'new', 1)"))
+
+    command.upgrade(config, "head")
+    command.check(config)
+    with db_engine.connect() as conn:
+        assert "updated_at" in {c["name"] for c in inspect(conn).get_columns("users")}
+        assert conn.execute(text("SELECT updated_at FROM users")).scalar() == "2024-01-01 00:00:00"
+        assert conn.execute(text("SELECT rowid FROM defects_fts WHERE defects_fts MATCH 'crack'")).scalar() == 1
+        # existing defects enter the change log, so a sync from cursor 0 sees them
+        assert conn.execute(text("SELECT defect_id FROM defect_events")).scalars().all() == [1]
+    db_engine.dispose()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database")
+def test_postgres_defect_events_commit_in_seq_order():
+    config = alembic_config(POSTGRES_URL)
+    command.upgrade(config, "head")
+    db_engine = create_engine(POSTGRES_URL)
+    insert_event = text("INSERT INTO defect_events (defect_id, project_id) VALUES (1, 1) RETURNING seq")
+    try:
+        with db_engine.connect() as first:
+            first.begin()
+            first_seq = first.execute(insert_event).scalar()
+            second = {}
+
+            def concurrent_writer():
+                with db_engine.begin() as conn:
+                    second["seq"] = conn.execute(insert_event).scalar()
+
+            writer = threading.Thread(target=concurrent_writer)
+            writer.start()
+            writer.join(0.5)
+            # the second writer waits for the first to commit before taking a seq
+            assert writer.is_alive() and "seq" not in second
+            first.commit()
+            writer.join(5)
+        assert second["seq"] > first_seq
+    finally:
+        db_engine.dispose()
+        command.downgrade(config, "base")
+    # a full downgrade leaves nothing behind (enum types included), so the chain can run again
+    command.upgrade(config, "head")
+    command.check(config)
+    command.downgrade(config, "base")
@@ -16,3 +16,59 @@ def test_project_create_and_list(test_client):
     resp = test_client.get("/projects/", headers=headers2)
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+def test_project_list_conditional_get(test_client):
+    headers = {"Authorization": f"Bearer {get_token(test_client, 'manager', 'managerpass')}"}
+    test_client.post("/projects/", json={"name":"E1"}, headers=headers)
+    first = test_client.get("/projects/", headers=headers)
+    etag = first.headers["etag"]
+    r = test_client.get("/projects/", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    test_client.post("/projects/", json={"name":"E2"}, headers=headers)
+    r = test_client.get("/projects/", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()) == 2
+
+
+def test_defect_and_user_lists_revalidate_after_writes(test_client):
+    headers = {"Authorization": f"Bearer {get_token(test_client, 'manager', 'managerpass')}"}
+    pid = test_client.post("/projects/", json={"name":"E3"}, headers=headers).json()["id"]
+    did = test_client.post("/defects/", json={"title":"T", "project_id":pid}, headers=headers).json()["id"]
+
+    etag = test_client.get("/defects/", params={"project_id": pid}, headers=headers).headers["etag"]
+    assert test_client.get("/defects/", params={"project_id": pid}, headers={**headers, "If-None-Match": etag}).status_code == 304
+    # a different filter is a different representation
+    assert test_client.get("/defects/", params={"project_id": pid, "limit": 1}, headers={**headers, "If-None-Match": etag}).status_code == 200
+    test_client.put(f"/defects/{did}", json={"status":"closed"}, headers=headers)
+    assert test_client.get("/defects/", params={"project_id": pid}, headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    etag = test_client.get("/users/", headers=headers).headers["etag"]
+    assert test_client.get("/users/", headers={**headers, "If-None-Match": etag}).status_code == 304
+    test_client.put("/users/me", json={"full_name": "Manager"}, headers=headers)
+    assert test_client.get("/users/", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+def test_list_versions_track_every_write_path(test_client):
+    from sqlalchemy import text
+    from app.database import SessionLocal
+    from app.models import Defect, Project
+    from app.services.version_service import version_query
+    headers = {"Authorization": f"Bearer {get_token(test_client, 'manager', 'managerpass')}"}
+    pid = test_client.post("/projects/", json={"name":"E4"}, headers=headers).json()["id"]
+    did = test_client.post("/defects/", json={"title":"T", "project_id":pid}, headers=headers).json()["id"]
+
+    # the probe never touches the listed table itself
+    assert "FROM defects" not in str(version_query(Defect))
+    assert "FROM projects" not in str(version_query(Project))
+
+    etag = test_client.get("/defects/", headers=headers).headers["etag"]
+    assert test_client.delete(f"/defects/{did}", headers=headers).status_code == 204
+    assert test_client.get("/defects/", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    etag = test_client.get("/projects/", headers=headers).headers["etag"]
+    with SessionLocal() as db:
+        # a raw statement outside the ORM still bumps the counter
+        db.execute(text("UPDATE projects SET description = 'raw' WHERE id = :id"), {"id": pid})
+        db.commit()
+    assert test_client.get("/projects/", headers={**headers, "If-None-Match": etag}).status_code == 200
@@ -9,3 +9,270 @@ def test_export_csv(test_client):
     r = test_client.get("/reports/defects/csv?project_id=" + str(pid), headers=headers)
     assert r.status_code == 200
     assert "id,title,description" in r.text
+
+def test_defect_stats(test_client):
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"P4", "description":"Project 4"}, headers=headers).json()["id"]
+    for title, priority in (("A", 1), ("B", 1), ("C", 3)):
+        test_client.post("/defects/", json={"title":title, "priority":priority, "project_id":pid}, headers=headers)
+    r = test_client.get("/reports/defects/stats?project_id=" + str(pid), headers=headers)
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"new": 3}
+    assert stats["by_priority"] == {"1": 2, "3": 1}
+    assert stats["by_project"] == {str(pid): 3}
+    assert stats["by_assignee"] == {"unassigned": 3}
+
+def test_csv_is_generated_in_batches(test_client):
+    from app.database import SessionLocal
+    from app.services.report_service import iter_defects_csv
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"P5"}, headers=headers).json()["id"]
+    for i in range(5):
+        test_client.post("/defects/", json={"title":f"Row {i}", "project_id":pid}, headers=headers)
+    db = SessionLocal()
+    try:
+        chunks = list(iter_defects_csv(db, project_id=pid, batch_size=2))
+    finally:
+        db.close()
+    # header chunk + ceil(5 / 2) row chunks
+    assert len(chunks) == 4
+    assert "".join(chunks).count("Row ") == 5
+
+def test_background_csv_job(test_client, tmp_path, monkeypatch):
+    import datetime
+    import os
+    import time
+    from app.config import settings
+    from app.services.job_runner import job_runner
+
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path))
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Jobs"}, headers=headers).json()["id"]
+    for title in ("A", "B", "C"):
+        test_client.post("/defects/", json={"title":title, "project_id":pid}, headers=headers)
+
+    r = test_client.post("/reports/jobs", json={"project_id": pid}, headers=headers)
+    assert r.status_code == 202
+    job_id = r.json()["id"]
+    for _ in range(100):
+        job = test_client.get(f"/reports/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("done", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "done", job
+    assert job["rows_done"] == job["rows_total"] == 3
+    assert job["params"] == {"project_id": pid}
+
+    download = test_client.get(f"/reports/jobs/{job_id}/download", headers=headers)
+    assert download.status_code == 200
+    assert download.text == test_client.get(f"/reports/defects/csv?project_id={pid}", headers=headers).text
+
+    # only the owner (or a manager/admin) sees the job
+    eng = test_client.post("/auth/token", data={"username":"engineer","password":"engineerpass"}).json()["access_token"]
+    assert test_client.get(f"/reports/jobs/{job_id}", headers={"Authorization": f"Bearer {eng}"}).status_code == 404
+
+    # a result file removed behind the job's back is gone, not a server error
+    saved = download.content
+    os.remove(tmp_path / f"job-{job_id}.csv")
+    assert test_client.get(f"/reports/jobs/{job_id}/download", headers=headers).status_code == 410
+    (tmp_path / f"job-{job_id}.csv").write_bytes(saved)
+
+    assert job_runner.cleanup_expired(now=datetime.datetime.utcnow() + datetime.timedelta(days=2)) == 1
+    assert test_client.get(f"/reports/jobs/{job_id}/download", headers=headers).status_code == 410
+    assert list(tmp_path.iterdir()) == []
+
+def test_report_job_limit_holds_under_concurrent_submits():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.database import SessionLocal
+    from app.models import User
+    from app.services.job_runner import JobLimitReached, job_runner
+
+    with SessionLocal() as db:
+        user_id = db.query(User.id).filter(User.username == "manager").scalar()
+
+    def submit(_):
+        with SessionLocal() as db:
+            try:
+                return job_runner.create_job(db, "defects_csv", {"project_id": None}, user_id, 2).id
+            except JobLimitReached:
+                return None
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = [job_id for job_id in pool.map(submit, range(8)) if job_id]
+    assert len(created) == 2
+
+def test_report_job_limit_counts_on_the_writer_connection(tmp_path):
+    import pytest
+    from app.database import Base, RoutingSession, create_db_engine
+    from app.models import RoleEnum, User
+    from app.services.job_runner import JobLimitReached, job_runner
+
+    url = f"sqlite:///{tmp_path / 'routed.db'}"
+    reader = create_db_engine(url)
+    writer = create_db_engine(url, pool_size=1, max_overflow=0)
+    Base.metadata.create_all(writer)
+    with RoutingSession(bind=reader, writer=writer) as db:
+        user = User(username="u", hashed_password="x", role=RoleEnum.engineer)
+        db.add(user)
+        db.commit()
+        for _ in range(2):
+            job_runner.create_job(db, "defects_csv", {}, user.id, 2)
+        with pytest.raises(JobLimitReached):
+            job_runner.create_job(db, "defects_csv", {}, user.id, 2)
+    reader.dispose()
+    writer.dispose()
+
+def test_concurrent_jobs_write_progress_without_exhausting_the_job_pool(monkeypatch, tmp_path):
+    import threading
+    import time
+    from sqlalchemy import text
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.models import JobStatus, ReportJob
+    from app.services import job_runner as runner_module
+    from app.services.job_runner import JOB_KINDS, JobRunner
+
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 2.0)
+    monkeypatch.setattr(runner_module, "PROGRESS_FLUSH_SECONDS", 0.0)
+    both_running = threading.Barrier(2, timeout=5)
+
+    def slow_export(db, job, path, progress):
+        db.execute(text("SELECT 1"))  # the job's session now holds its connection
+        both_running.wait()
+        with open(path, "w") as f:
+            for _ in range(3):
+                progress(1)
+                f.write("row\n")
+                time.sleep(0.01)
+
+    monkeypatch.setitem(JOB_KINDS, "slow_export", (slow_export, ".txt", "text/plain"))
+    runner = JobRunner(workers=2, max_queued=2)
+    with SessionLocal() as db:
+        jobs = [ReportJob(kind="slow_export", params="{}") for _ in range(2)]
+        db.add_all(jobs)
+        db.commit()
+        ids = [job.id for job in jobs]
+    try:
+        for job_id in ids:
+            runner.submit(job_id)
+        for _ in range(200):
+            if runner.pending == 0:
+                break
+            time.sleep(0.05)
+    finally:
+        runner.shutdown()
+    with SessionLocal() as db:
+        finished = [db.get(ReportJob, job_id) for job_id in ids]
+        assert [(job.status, job.rows_done) for job in finished] == [(JobStatus.done, 3)] * 2, [j.error for j in finished]
+
+def test_jobs_with_an_expired_lease_are_failed(monkeypatch, tmp_path):
+    import datetime
+    import threading
+    import time
+    from sqlalchemy import update
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.models import JobStatus, ReportJob
+    from app.services.job_runner import JOB_KINDS, JobRunner
+
+    monkeypatch.setattr(settings, "REPORT_DIR", str(tmp_path))
+    release = threading.Event()
+
+    def blocked_export(db, job, path, progress):
+        release.wait(5)
+        open(path, "w").close()
+
+    monkeypatch.setitem(JOB_KINDS, "blocked_export", (blocked_export, ".txt", "text/plain"))
+    now = datetime.datetime.utcnow()
+    long_ago = now - datetime.timedelta(seconds=settings.REPORT_JOB_LEASE_SECONDS + 60)
+    with SessionLocal() as db:
+        jobs = {
+            "fresh": ReportJob(kind="defects_csv", params="{}", heartbeat_at=now),
+            "abandoned": ReportJob(kind="defects_csv", params="{}", heartbeat_at=long_ago),  # e.g. a replaced container
+            "legacy": ReportJob(kind="defects_csv", params="{}"),
+            "live": ReportJob(kind="blocked_export", params="{}", heartbeat_at=now),
+        }
+        db.add_all(jobs.values())
+        db.commit()
+        ids = {name: job.id for name, job in jobs.items()}
+
+    runner = JobRunner(workers=1, max_queued=1)
+    try:
+        runner.submit(ids["live"])
+        # the live job's lease is old too, but its process is still renewing it
+        with SessionLocal() as db:
+            db.execute(update(ReportJob).where(ReportJob.id == ids["live"]).values(heartbeat_at=long_ago))
+            db.commit()
+        assert runner.renew_leases() == 1
+        assert runner.fail_stale() == 2
+        with SessionLocal() as db:
+            failed = {name for name, job_id in ids.items() if db.get(ReportJob, job_id).status == JobStatus.failed}
+        assert failed == {"abandoned", "legacy"}
+        release.set()
+        for _ in range(100):
+            if runner.pending == 0:
+                break
+            time.sleep(0.05)
+    finally:
+        release.set()
+        runner.shutdown()
+    with SessionLocal() as db:
+        assert db.get(ReportJob, ids["live"]).status == JobStatus.done
+
+def test_csv_export_is_cached_by_data_version(test_client, monkeypatch):
+    from app.routers import reports
+    from app.services.report_cache import report_cache
+    from app.services.report_service import stream_defects_csv
+    token = test_client.post("/auth/token", data={"username":"manager","password":"managerpass"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = test_client.post("/projects/", json={"name":"Cached"}, headers=headers).json()["id"]
+    defect_id = test_client.post("/defects/", json={"title":"Leak", "project_id":pid}, headers=headers).json()["id"]
+    url = f"/reports/defects/csv?project_id={pid}"
+
+    hits, misses = report_cache.hits, report_cache.misses
+    first = test_client.get(url, headers=headers)
+    # hits and 304s never build the export stream
+    monkeypatch.setattr(reports, "stream_defects_csv", None)
+    second = test_client.get(url, headers=headers)
+    assert (report_cache.hits - hits, report_cache.misses - misses) == (1, 1)
+    assert second.text == first.text
+    assert second.headers["etag"] == first.headers["etag"]
+    assert test_client.get(url, headers={**headers, "If-None-Match": first.headers["etag"]}).status_code == 304
+
+    monkeypatch.setattr(reports, "stream_defects_csv", stream_defects_csv)
+
+    # any change to the exported rows is a new data version
+    test_client.put(f"/defects/{defect_id}", json={"title":"Roof leak"}, headers=headers)
+    third = test_client.get(url, headers=headers)
+    assert report_cache.misses - misses == 2
+    assert "Roof leak" in third.text and third.headers["etag"] != first.headers["etag"]
+    assert "report_cache_hits" in test_client.get("/metrics").text
+
+def test_report_cache_evicts_least_recently_used(tmp_path):
+    from app.services.report_cache import ReportCache
+
+    cache = ReportCache(str(tmp_path), max_bytes=25, max_entries=10)
+    for key in ("a", "b"):
+        assert cache.get(key) is None
+        assert "".join(cache.fill(key, iter(["x" * 5, "y" * 5]))) == "x" * 5 + "y" * 5
+    assert cache.get("a")  # "b" is now the least recently used
+    list(cache.fill("c", iter(["z" * 10])))
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+    assert cache.stats()["evictions"] == 1 and cache.bytes == 20
+
+    # a stream closed early (client disconnect) publishes nothing
+    partial = cache.fill("d", iter(["1", "2"]))
+    next(partial)
+    partial.close()
+    assert cache.get("d") is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.csv", "c.csv"]
+
+    # a restarted process rebuilds the index from the directory
+    assert ReportCache(str(tmp_path), max_bytes=25, max_entries=10).get("c")
@@ -0,0 +1,27 @@
+from sqlalchemy import func, select
+
+from app.database import Base, create_db_engine
+from app.models import Defect, User
+from app.services import seed_service
+
+
+def test_seed_bulk_and_hashes_each_password_once(tmp_path, monkeypatch):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(bind=db_engine)
+    hashed = []
+    monkeypatch.setattr(seed_service, "hash_password", lambda p: hashed.append(p) or f"h:{p}")
+
+    created = seed_service.seed_database(db_engine, users=50, projects=5, defects=2500, batch_size=1000)
+    assert created == {"demo_users": 4, "users": 50, "projects": 5, "defects": 2500}
+    # admin123, user123, view123 and the shared generated password
+    assert sorted(hashed) == ["admin123", "user123", "userpass", "view123"]
+
+    with db_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Defect)).scalar_one() == 2500
+        assert conn.execute(select(func.count(func.distinct(Defect.status)))).scalar_one() == 5
+        assert conn.execute(select(func.count()).where(Defect.assigned_to.is_(None))).scalar_one() > 0
+
+    # demo accounts are not duplicated, generated names keep counting up
+    assert seed_service.seed_database(db_engine, users=1)["demo_users"] == 0
+    with db_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(User)).scalar_one() == 55
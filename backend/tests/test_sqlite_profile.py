@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from sqlalchemy import exc, insert, table, text
+
+from app.config import settings
+from app.database import RoutingSession, create_db_engine
+
+
+def make_engine(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'site.db'}")
+    with db_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY, v TEXT)"))
+        conn.execute(text("INSERT INTO t (v) VALUES ('a')"))
+    return db_engine
+
+
+def open_read_transaction(db_engine):
+    raw = db_engine.raw_connection()
+    raw.driver_connection.isolation_level = None
+    cursor = raw.cursor()
+    cursor.execute("BEGIN")
+    assert cursor.execute("SELECT count(*) FROM t").fetchone()[0] == 1
+    return raw, cursor
+
+
+def test_pragmas_applied_on_connect(tmp_path):
+    db_engine = make_engine(tmp_path)
+    with db_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+
+def test_open_reader_does_not_block_writer_under_wal(tmp_path):
+    db_engine = make_engine(tmp_path)
+    raw, cursor = open_read_transaction(db_engine)
+    try:
+        start = time.perf_counter()
+        with db_engine.begin() as conn:
+            conn.execute(text("INSERT INTO t (v) VALUES ('b')"))
+        assert time.perf_counter() - start < 1.0
+        # the reader keeps its snapshot until it ends its transaction
+        assert cursor.execute("SELECT count(*) FROM t").fetchone()[0] == 1
+        cursor.execute("COMMIT")
+        assert cursor.execute("SELECT count(*) FROM t").fetchone()[0] == 2
+    finally:
+        raw.close()
+
+
+def test_rollback_journal_blocks_writer_for_contrast(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_JOURNAL_MODE", "DELETE")
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 100)
+    db_engine = make_engine(tmp_path)
+    raw, cursor = open_read_transaction(db_engine)
+    try:
+        with pytest.raises(exc.OperationalError, match="locked"):
+            with db_engine.begin() as conn:
+                conn.execute(text("INSERT INTO t (v) VALUES ('b')"))
+    finally:
+        raw.close()
+
+
+def test_routing_session_sends_writes_to_writer(tmp_path):
+    db_engine = make_engine(tmp_path)
+    writer = create_db_engine(str(db_engine.url), pool_size=1, max_overflow=0)
+    session = RoutingSession(bind=db_engine, writer=writer)
+    assert session.get_bind(clause=text("SELECT 1")) is db_engine
+    assert session.get_bind(clause=insert(table("t"))) is writer
@@ -0,0 +1,46 @@
+from app import models
+from app.database import SessionLocal
+from app.deps import user_cache
+from app.utils.security import hash_password
+
+
+def login(client, username, password):
+    token = client.post("/auth/token", data={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_principal_cache_invalidated_on_role_change(test_client):
+    db = SessionLocal()
+    db.add(models.User(username="admin", hashed_password=hash_password("adminpass"), role=models.RoleEnum.admin))
+    db.commit()
+    db.close()
+    admin = login(test_client, "admin", "adminpass")
+    engineer = login(test_client, "engineer", "engineerpass")
+
+    me = test_client.get("/users/me", headers=engineer).json()
+    hits = user_cache.hits
+    assert test_client.get("/users/me", headers=engineer).json()["role"] == "engineer"
+    assert user_cache.hits == hits + 1
+
+    r = test_client.put(f"/users/{me['id']}/role", json={"role": "manager"}, headers=admin)
+    assert r.status_code == 200
+    assert test_client.get("/users/me", headers=engineer).json()["role"] == "manager"
+
+    r = test_client.put("/users/me", json={"full_name": "Site Engineer"}, headers=engineer)
+    assert r.json()["full_name"] == "Site Engineer"
+    assert test_client.get("/users/me", headers=engineer).json()["full_name"] == "Site Engineer"
+
+    assert test_client.delete(f"/users/{me['id']}", headers=admin).status_code == 200
+    assert test_client.get("/users/me", headers=engineer).status_code == 401
+
+
+def test_list_users_query_count(test_client, max_queries):
+    manager = login(test_client, "manager", "managerpass")
+    test_client.get("/users/me", headers=manager)
+    db = SessionLocal()
+    db.add_all([models.User(username=f"u{i}", hashed_password="x", role=models.RoleEnum.observer) for i in range(20)])
+    db.commit()
+    db.close()
+    with max_queries(2) as stats:
+        assert len(test_client.get("/users/", headers=manager).json()) == 23
+    assert stats.total_seconds > 0
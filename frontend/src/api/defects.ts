@@ -43,3 +43,19 @@ export async function updateDefect(id: number, defect: DefectUpdate) {
   const r = await client.put(`/defects/${id}`, defect);
   return r.data;
 }
+
+export interface DefectChanges {
+  cursor: number;
+  changes: Defect[];
+  deleted: number[];
+  has_more: boolean;
+}
+
+// Delta sync: only defects written after `since` (cursor from the previous call)
+export async function listDefectChanges(since: number, project_id?: number) {
+  const params = new URLSearchParams({ since: since.toString() });
+  if (project_id) params.append('project_id', project_id.toString());
+
+  const r = await client.get<DefectChanges>(`/defects/changes?${params.toString()}`);
+  return r.data;
+}
@@ -5,3 +5,17 @@ export async function exportCSV(projectId?: number) {
   const r = await client.get(url, { responseType: "blob" });
   return r.data;
 }
+
+export interface DefectStats {
+  total: number;
+  by_status: Record<string, number>;
+  by_priority: Record<string, number>;
+  by_project: Record<string, number>;
+  by_assignee: Record<string, number>;
+}
+
+export async function getDefectStats(projectId?: number) {
+  const url = projectId ? `/reports/defects/stats?project_id=${projectId}` : "/reports/defects/stats";
+  const r = await client.get<DefectStats>(url);
+  return r.data;
+}
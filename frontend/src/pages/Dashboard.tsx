@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useSelector } from 'react-redux';
 import { RootState } from '../store/store';
 import client from '../api/client';
+import { getDefectStats } from '../api/reports';
 
 interface Stats {
   totalProjects: number;
@@ -31,22 +32,18 @@ const Dashboard: React.FC = () => {
         const projectsResponse = await client.get('/projects/', { headers });
         const totalProjects = projectsResponse.data.length;
 
-        // Получаем дефекты
-        const defectsResponse = await client.get('/defects/', { headers });
-        const defects = defectsResponse.data;
-        const totalDefects = defects.length;
+        // Счётчики дефектов считает сервер одним GROUP BY запросом
+        const defectStats = await getDefectStats();
+        const totalDefects = defectStats.total;
+        const defectsByStatus = defectStats.by_status;
 
-        // Группируем по статусам
-        const defectsByStatus = defects.reduce((acc: Record<string, number>, defect: any) => {
-          acc[defect.status] = (acc[defect.status] || 0) + 1;
-          return acc;
-        }, {});
-
-        // Группируем по приоритетам
-        const defectsByPriority = defects.reduce((acc: Record<string, number>, defect: any) => {
-          acc[`priority-${defect.priority}`] = (acc[`priority-${defect.priority}`] || 0) + 1;
-          return acc;
-        }, {});
+        const defectsByPriority = Object.entries(defectStats.by_priority).reduce(
+          (acc: Record<string, number>, [priority, count]) => {
+            acc[`priority-${priority}`] = count;
+            return acc;
+          },
+          {}
+        );
 
         setStats({
           totalProjects,